@@ -0,0 +1,43 @@
+from timeit import default_timer as timer
+from typing import Callable, Optional
+from numpy import ndarray, zeros, min
+from numpy.random import default_rng
+
+from tiled_prod    import matprod_tiled
+from strassen_prod import matprod_strassen
+
+def test_product(f          : Callable[[ndarray, ndarray], ndarray],
+                 n          : int,
+                 iterations : Optional[int] = 3) -> ndarray:
+    rng = default_rng()
+    A = rng.standard_normal((n, n))
+    B = rng.standard_normal((n, n))
+    times = zeros(iterations)
+    for i in range(iterations):
+        start = timer()
+        f(A, B)
+        end = timer()
+        times[i] = end - start
+    return times
+
+products = [
+    ['numpy',            lambda A, B: A @ B],
+    ['tiled',            matprod_tiled],
+    ['strassen (numpy)', matprod_strassen],
+    ['strassen (tiled)', lambda A, B: matprod_strassen(A, B, base='tiled')],
+]
+sizes = [256, 512, 1024, 2048, 4096]
+timedata = {}
+
+for n in sizes:
+    print(f'n = {n}:')
+    for name, f in products:
+        timedata[name, n] = min(test_product(f, n))
+        print(f'\t{name:<18}minimum time: {timedata[name, n]:.4f}')
+
+for name, _ in products[2:]:
+    faster = [n for n in sizes if timedata[name, n] < timedata['numpy', n]]
+    if faster:
+        print(f'{name} beats the classical product from n = {faster[0]} on')
+    else:
+        print(f'{name} does not beat the classical product up to n = {sizes[-1]}')
@@ -0,0 +1,133 @@
+import numpy as np
+from numpy import ndarray as Matrix
+from typing import Optional, List, Tuple
+
+from tiled_prod import matprod_tiled
+
+# untuned default: blocks of at most this size use the classical product, Timing.py does not measure the cutoff
+CUTOFF = 512
+
+def workspace(n : int, cutoff : Optional[int] = CUTOFF,
+              dtype : Optional[type] = np.float64) -> List[Tuple[Matrix, Matrix]]:
+    """
+    Allocate the temporaries for ``matprod_strassen`` on a (n x n) problem
+
+    Each recursion level on a (2h x 2h) product needs two (h x h) temporaries, one for sums of blocks of A
+    and one for sums of blocks of B, all other intermediate results live in the quadrants of C. Summed over
+    all levels this is less than n^2 entries, independent of the depth of the recursion.
+    """
+    levels = []
+    while n > cutoff and n % 2 == 0:
+        n //= 2
+        levels.append((np.empty((n, n), dtype=dtype), np.empty((n, n), dtype=dtype)))
+    return levels
+
+def padded_size(n : int, cutoff : Optional[int] = CUTOFF) -> int:
+    """
+    Return the smallest m >= n, which can be halved until it is at most ``cutoff``
+
+    Padding once to this size is cheaper than padding odd dimensions on every level of the recursion, and adds
+    at most 2^levels - 1 zero rows and columns.
+    """
+    levels = 0
+    while -(-n // 2**levels) > cutoff:
+        levels += 1
+    return -(-n // 2**levels) * 2**levels
+
+def matprod_strassen(A : Matrix, B : Matrix, out : Optional[Matrix] = None, cutoff : Optional[int] = CUTOFF,
+                     base : Optional[str] = 'numpy') -> Matrix:
+    """
+    Compute C = AB for square matrices with the Strassen-Winograd algorithm
+
+    Each recursion level replaces 8 products of half size by 7 products and 15 additions, giving
+    O(n^log2(7)) = O(n^2.81) operations. Once a block is at most ``cutoff`` large, the classical product is used,
+    either numpy's (``base = 'numpy'``) or ``matprod_tiled`` (``base = 'tiled'``). Dimensions that cannot be
+    halved down to the cutoff are zero-padded once at the top level.
+
+    All temporaries are allocated once before the recursion starts (see ``workspace``). If n can be halved down
+    to the cutoff, the peak memory stays at about 3n^2 entries for A, B and C plus less than n^2 for the
+    workspace. Otherwise the zero-padded copies of A, B and C of size m = ``padded_size(n)`` < n + 2^levels add
+    3m^2 entries and the workspace grows to less than m^2, i.e. the peak is about 3n^2 + 4m^2. If ``out`` is
+    given, the result is written into it.
+
+    Note that the error bound of Strassen-type algorithms is normwise instead of componentwise, i.e. small
+    entries of C may carry a larger relative error than with the classical product.
+    """
+    # verify matrix product can be computed
+    n, ma = A.shape
+    mb, p = B.shape
+
+    if not n == ma == mb == p:
+        raise ValueError('matprod_strassen requires square matrices of equal size')
+
+    if base not in ('numpy', 'tiled'):
+        raise ValueError(f'invalid base case specified: {base}')
+
+    dtype = np.result_type(A, B, np.float64)
+    if out is None:
+        out = np.empty((n, n), dtype=dtype)
+    elif out.shape != (n, n):
+        raise ValueError(f'out has shape {out.shape}, but product has shape {(n, n)}')
+
+    m = padded_size(n, cutoff)
+    if m != n:
+        Ap = np.zeros((m, m), dtype=dtype)
+        Bp = np.zeros((m, m), dtype=dtype)
+        Cp = np.empty((m, m), dtype=dtype)
+        Ap[:n, :n] = A
+        Bp[:n, :n] = B
+    else:
+        Ap, Bp, Cp = A, B, out
+
+    _winograd(Ap, Bp, Cp, workspace(m, cutoff, dtype), cutoff, base)
+
+    if m != n:
+        out[...] = Cp[:n, :n]
+    return out
+
+def _winograd(A : Matrix, B : Matrix, C : Matrix, work : List[Tuple[Matrix, Matrix]], cutoff : int, base : str) -> None:
+    n = A.shape[0]
+    if n <= cutoff or not work:
+        if base == 'tiled':
+            matprod_tiled(A, B, C)
+        else:
+            np.matmul(A, B, out=C)
+        return
+
+    h = n // 2
+    X, Y = work[0]
+    sub = work[1:]
+    A11, A12, A21, A22 = A[:h, :h], A[:h, h:], A[h:, :h], A[h:, h:]
+    B11, B12, B21, B22 = B[:h, :h], B[:h, h:], B[h:, :h], B[h:, h:]
+    C11, C12, C21, C22 = C[:h, :h], C[:h, h:], C[h:, :h], C[h:, h:]
+
+    # schedule by Douglas et al. (1994), which needs only the two temporaries X and Y
+    np.subtract(A11, A21, out=X)
+    np.subtract(B22, B12, out=Y)
+    _winograd(X, Y, C21, sub, cutoff, base)     # C21 = P7
+    np.add(A21, A22, out=X)
+    np.subtract(B12, B11, out=Y)
+    _winograd(X, Y, C22, sub, cutoff, base)     # C22 = P5
+    X -= A11
+    np.subtract(B22, Y, out=Y)
+    _winograd(X, Y, C12, sub, cutoff, base)     # C12 = P6
+    np.subtract(A12, X, out=X)
+    _winograd(X, B22, C11, sub, cutoff, base)   # C11 = P3
+    _winograd(A11, B11, X, sub, cutoff, base)   # X   = P1
+    C12 += X                                    # C12 = P1 + P6
+    C21 += C12                                  # C21 = P1 + P6 + P7
+    C12 += C22                                  # C12 = P1 + P5 + P6
+    C22 += C21                                  # C22 = P1 + P5 + P6 + P7    (final)
+    C12 += C11                                  # C12 = P1 + P3 + P5 + P6    (final)
+    Y -= B21
+    _winograd(A22, Y, C11, sub, cutoff, base)   # C11 = P4
+    C21 -= C11                                  # C21 = P1 - P4 + P6 + P7    (final)
+    _winograd(A12, B21, C11, sub, cutoff, base) # C11 = P2
+    C11 += X                                    # C11 = P1 + P2              (final)
+
+if __name__ == '__main__':
+    A = np.array([[-2, 5, 1], [0, 8, -7], [9, -4, -3]])
+    B = np.array([[3, -4, 6,], [-5, 2, -1,], [8, -9, 0,]])
+
+    print(A@B)
+    print(matprod_strassen(A, B, cutoff=1))
@@ -0,0 +1,203 @@
+import json
+import numpy as np
+from numpy import ndarray as Matrix
+from concurrent.futures import ThreadPoolExecutor
+from os import cpu_count
+from pathlib import Path
+from platform import node
+from timeit import default_timer as timer
+from typing import Optional, Sequence
+
+# 3 float64 tiles of 160x160 take ~600 KiB, which fits the L2 cache of most current cpus
+DEFAULT_TILE = 160
+TUNE_FILE = Path.home() / '.cache' / 'numerical_math' / 'tile_size.json'
+# products with more multiply-adds than this are split across threads by matprod_auto
+THREAD_THRESHOLD = 256**3
+
+_tile = None
+
+def matprod_tiled(A : Matrix, B : Matrix, out : Optional[Matrix] = None, tile : Optional[int] = None,
+                  accumulate : Optional[bool] = False) -> Matrix:
+    """
+    Cache-blocked matrix product C = AB
+
+    The product is split into tiles of (at most) ``tile`` x ``tile`` entries, such that the three tiles
+    involved in one step stay in cache. Every tile product is one vectorized call (the micro-kernel), so
+    only O((n/tile)^3) python-level iterations remain instead of O(n^2) for ``matprod_fast``. Tiles on the
+    border are simply cut off, thus any rectangular shape is supported.
+
+    If ``out`` is given, the result is written into it (and returned), so repeated products need no new
+    allocation. With ``accumulate`` the product is added to the contents of ``out`` instead, i.e. C += AB.
+    If ``tile`` is None, the autotuned tile size for this host is used (see ``tile_size``).
+    """
+    # verify matrix product can be computed
+    n, ma = A.shape
+    mb, p = B.shape
+
+    if ma != mb:
+        raise ValueError('dimension mismatch between A and B')
+
+    if out is None:
+        out = np.zeros((n, p), dtype=np.result_type(A, B))
+    elif out.shape != (n, p):
+        raise ValueError(f'out has shape {out.shape}, but product has shape {(n, p)}')
+    elif not accumulate:
+        out[...] = 0
+
+    if tile is None:
+        tile = tile_size()
+
+    buffer = np.empty((tile, tile), dtype=out.dtype) # reused by every micro-kernel call
+
+    for i in range(0, n, tile):
+        for j in range(0, p, tile):
+            _block(A, B, out, i, j, tile, buffer)
+    return out
+
+def matprod_threaded(A : Matrix, B : Matrix, out : Optional[Matrix] = None, tile : Optional[int] = None,
+                     accumulate : Optional[bool] = False, workers : Optional[int] = None) -> Matrix:
+    """
+    Same as ``matprod_tiled``, however the tiles of C are distributed over a pool of ``workers`` threads
+
+    Every tile of C is owned by exactly one task, which accumulates all of its tile products, thus no locking
+    is required. Since numpy releases the GIL inside of matmul, the micro-kernels run in parallel. If
+    ``workers`` is None, one thread per cpu is used.
+
+    Note that if numpy is linked against a multithreaded BLAS, its own threads compete with the pool, in that
+    case the BLAS should be limited to a single thread (e.g. OMP_NUM_THREADS=1).
+    """
+    # verify matrix product can be computed
+    n, ma = A.shape
+    mb, p = B.shape
+
+    if ma != mb:
+        raise ValueError('dimension mismatch between A and B')
+
+    if out is None:
+        out = np.zeros((n, p), dtype=np.result_type(A, B))
+    elif out.shape != (n, p):
+        raise ValueError(f'out has shape {out.shape}, but product has shape {(n, p)}')
+    elif not accumulate:
+        out[...] = 0
+
+    if tile is None:
+        tile = tile_size()
+
+    def task(i : int, j : int) -> None:
+        _block(A, B, out, i, j, tile, np.empty((tile, tile), dtype=out.dtype))
+
+    with ThreadPoolExecutor(workers or cpu_count()) as pool:
+        # list() re-raises exceptions of the tasks
+        list(pool.map(lambda ij: task(*ij), [(i, j) for i in range(0, n, tile) for j in range(0, p, tile)]))
+    return out
+
+def matprod_batched(A : Matrix, B : Matrix, out : Optional[Matrix] = None, workers : Optional[int] = 1) -> Matrix:
+    """
+    Multiply two stacks of matrices pairwise, i.e. C[l] = A[l] B[l] for A (k x n x m) and B (k x m x p)
+
+    The whole stack is handed to numpy in one call, so thousands of small products cost a single python-level
+    call instead of one (or n*p for ``matprod_fast``) per pair. A single matrix on either side is broadcast
+    against the whole stack. With ``workers`` > 1 the stack is split into contiguous chunks, which are
+    multiplied in parallel threads.
+    """
+    if A.ndim not in (2, 3) or B.ndim not in (2, 3) or A.shape[-1] != B.shape[-2]:
+        raise ValueError(f'cannot multiply stacks of shape {A.shape} and {B.shape}')
+
+    shape = np.broadcast_shapes(A.shape[:-2], B.shape[:-2]) + (A.shape[-2], B.shape[-1])
+    if out is None:
+        out = np.empty(shape, dtype=np.result_type(A, B))
+    elif out.shape != shape:
+        raise ValueError(f'out has shape {out.shape}, but product has shape {shape}')
+
+    if workers == 1 or out.ndim == 2:
+        return np.matmul(A, B, out=out)
+
+    k = out.shape[0]
+    chunks = [slice(l, l + -(-k // workers)) for l in range(0, k, -(-k // workers))]
+
+    # only operands with a full stack are chunked, single matrices and length-1 stacks are broadcast
+    def task(chunk : slice) -> None:
+        np.matmul(A[chunk] if A.ndim == 3 and A.shape[0] == k else A,
+                  B[chunk] if B.ndim == 3 and B.shape[0] == k else B, out=out[chunk])
+
+    with ThreadPoolExecutor(workers) as pool:
+        list(pool.map(task, chunks))
+    return out
+
+def matprod_auto(A : Matrix, B : Matrix, out : Optional[Matrix] = None, workers : Optional[int] = None,
+                 tile : Optional[int] = None) -> Matrix:
+    """
+    Common entry point for all products in this module
+
+    Stacks of matrices (3 dimensional operands) are passed to ``matprod_batched``, single products with more than
+    ``THREAD_THRESHOLD`` multiply-adds to ``matprod_threaded`` and all remaining ones to ``matprod_tiled``.
+    """
+    if A.ndim == 3 or B.ndim == 3:
+        return matprod_batched(A, B, out, workers or 1)
+    if A.shape[0] * A.shape[1] * B.shape[1] > THREAD_THRESHOLD and workers != 1:
+        return matprod_threaded(A, B, out, tile, workers=workers)
+    return matprod_tiled(A, B, out, tile)
+
+def autotune(candidates : Optional[Sequence[int]] = (32, 64, 96, 128, 160, 192, 256, 384, 512),
+             n : Optional[int] = 1024, repeats : Optional[int] = 3, path : Optional[Path] = TUNE_FILE) -> int:
+    """
+    Benchmark ``matprod_tiled`` for every tile size in ``candidates`` and persist the fastest one
+
+    Every candidate multiplies two random (n x n) matrices ``repeats`` times, the minimum time counts. The
+    winner is stored in the json-file ``path`` under the hostname, such that the tuning only has to run
+    once per machine, and is returned.
+    """
+    rng = np.random.default_rng()
+    A = rng.standard_normal((n, n))
+    B = rng.standard_normal((n, n))
+    C = np.empty((n, n))
+
+    times = {}
+    for tile in candidates:
+        best = np.inf
+        for _ in range(repeats):
+            start = timer()
+            matprod_tiled(A, B, C, tile)
+            best = min(best, timer() - start)
+        times[tile] = best
+    winner = min(times, key=times.get)
+
+    table = _load(path)
+    table[node()] = winner
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(table, indent=4))
+
+    global _tile
+    _tile = winner
+    return winner
+
+def tile_size(path : Optional[Path] = TUNE_FILE) -> int:
+    """
+    Return the tile size tuned for this host, or ``DEFAULT_TILE`` if ``autotune`` has never been run here
+    """
+    global _tile
+    if _tile is None:
+        _tile = _load(path).get(node(), DEFAULT_TILE)
+    return _tile
+
+def _block(A : Matrix, B : Matrix, out : Matrix, i : int, j : int, tile : int, buffer : Matrix) -> None:
+    # accumulate all tile products contributing to the tile of C starting at (i,j)
+    C_blk = out[i:i+tile, j:j+tile]
+    tmp = buffer[:C_blk.shape[0], :C_blk.shape[1]]
+    for k in range(0, A.shape[1], tile):
+        np.matmul(A[i:i+tile, k:k+tile], B[k:k+tile, j:j+tile], out=tmp)
+        C_blk += tmp
+
+def _load(path : Path) -> dict:
+    try:
+        return json.loads(path.read_text())
+    except (OSError, ValueError):
+        return {}
+
+if __name__ == '__main__':
+    A = np.array([[-2, 5, 1, 1], [0, 8, -7, 2], [9, -4, -3,3]])
+    B = np.array([[3, -4, 6,], [-5, 2, -1,], [8, -9, 0,], [1,2,3]])
+
+    print(A@B)
+    print(matprod_tiled(A, B, tile=2))
+    print(f'tuned tile size: {autotune()}')
@@ -1,5 +1,5 @@
-from numpy import ndarray, float64, eye, tril, zeros
-from typing import Tuple
+from numpy import ndarray, float64, eye, tril, zeros, array
+from typing import Tuple, Optional
 from common import crout_forwsubs, crout_backsubs
 
 
@@ -50,4 +50,78 @@ def LUCSolver(A : ndarray, b : ndarray) -> ndarray:
     """
     L, U = LUCrout(A)
     y = crout_forwsubs(L, b)
-    return crout_backsubs(U, y)
\ No newline at end of file
+    return crout_backsubs(U, y)
+
+def LUCroutDiag(lower : ndarray, diag : ndarray, upper : ndarray) -> Tuple[ndarray, ndarray]:
+    """
+    Same as ``LUCrout``, however the tridiagonal matrix is passed by its three diagonals
+    
+    Only the n diagonal entries l_jj of L and the n-1 superdiagonal entries u_k(k+1) of U are computed and
+    returned (the subdiagonal of L equals ``lower``), which takes O(n) operations and memory instead of
+    O(n^2) for the full matrices. The recurrence runs on python floats, which is considerably faster than
+    indexing numpy arrays element by element. A vanishing l_jj shows up as ZeroDivisionError of the floats.
+    """
+    n = len(diag)
+    if len(lower) != n - 1 or len(upper) != n - 1:
+        raise ValueError('off-diagonals must have one entry less than the diagonal')
+
+    l = [float(diag[0])]
+    u = []
+    lk = l[0]
+    try:
+        for ak, bk, ck in zip(lower.tolist(), diag[1:].tolist(), upper.tolist()):
+            uk = ck / lk
+            lk = bk - ak * uk
+            u.append(uk)
+            l.append(lk)
+        if lk == 0.0:
+            raise ZeroDivisionError
+    except ZeroDivisionError:
+        raise ValueError('No crout decomposition exists') from None
+    return array(l), array(u)
+
+def LUCDiagSolver(lower : ndarray, diag : ndarray, upper : ndarray, b : ndarray,
+                  factors : Optional[Tuple[ndarray, ndarray]] = None) -> ndarray:
+    """
+    Solves Ax = b in O(n), where A is tridiagonal and given by its three diagonals
+    
+    1. Decompose A with ``LUCroutDiag`` into the diagonals of L and U
+    2. Solve Ly = b with forward substitution
+    3. Solve Ux = y with backward substitution
+
+    Steps 1 and 2 run in the same loop, since l_kk is only needed for y_k. If ``factors`` of a previous call of
+    ``LUCroutDiag`` are passed, step 1 is skipped, which allows to reuse the decomposition for several b.
+    """
+    n = len(diag)
+    if len(lower) != n - 1 or len(upper) != n - 1 or len(b) != n:
+        raise ValueError('dimension mismatch between the diagonals and b')
+    a, c, b = lower.tolist(), upper.tolist(), array(b, dtype=float64).tolist()
+
+    try:
+        if factors is None:
+            lk = float(diag[0])
+            yk = b[0] / lk
+            u = []
+            y = [yk]
+            for ak, dk, ck, bk in zip(a, diag[1:].tolist(), c, b[1:]):
+                uk = ck / lk
+                lk = dk - ak * uk
+                yk = (bk - ak * yk) / lk
+                u.append(uk)
+                y.append(yk)
+        else:
+            l, u = factors[0].tolist(), factors[1].tolist()
+            yk = b[0] / l[0]
+            y = [yk]
+            for ak, lk, bk in zip(a, l[1:], b[1:]):
+                yk = (bk - ak * yk) / lk
+                y.append(yk)
+    except ZeroDivisionError:
+        raise ValueError('No crout decomposition exists') from None
+
+    xk = y[-1]
+    x = [xk]
+    for yk, uk in zip(reversed(y[:-1]), reversed(u)):
+        xk = yk - uk * xk
+        x.append(xk)
+    return array(x[::-1])
@@ -6,16 +6,19 @@ from gauss import GaussElim
 from LUP import LUPSolver
 from Cholesky import CholeskySolver
 from Crout import LUCSolver
+from Verify import Sampled
 
 class DirectSolver:
     
-    def __init__(self) -> None:
+    def __init__(self, verify : Optional[float] = 0.0) -> None:
         self.methods = {
             'gauss': GaussElim,
             'LUP': LUPSolver,
             'cholesky': CholeskySolver,
             'crout': LUCSolver,
         }
+        if verify: # randomly check a fraction of all solutions
+            self.methods = {name: Sampled(f, verify) for name, f in self.methods.items()}
         
     def solve(self, A      : ndarray,
                     b      : ndarray,  
@@ -0,0 +1,140 @@
+from numpy import ndarray, float64, finfo, integer, issubdtype, array_equal
+from numpy.linalg import norm
+from numpy.random import default_rng, Generator
+from typing import Optional, Callable
+
+EPS = finfo(float64).eps
+
+def tolerance(rtol : Optional[float], n : int) -> float:
+    """
+    Return ``rtol`` or, if it is None, the default relative bound 10 n eps for products of order n
+
+    The rounding errors of an inner product of length n are bounded by n eps times the product of the norms, a
+    looser default would let genuinely wrong results pass.
+    """
+    return 10 * n * EPS if rtol is None else rtol
+
+def sketch(n : int, rounds : int, rng : Optional[Generator] = None, exact : Optional[bool] = False) -> ndarray:
+    """
+    Draw ``rounds`` random probe vectors of dimension ``n`` as the columns of a (n x rounds) matrix
+
+    For exact (integer) arithmetic the probes are drawn from {0,1} as in Freivalds' original algorithm, else the
+    entries are standard normal, which makes the norm of a probed residual E @ r an unbiased estimate of the
+    frobenius norm of E.
+    """
+    if rng is None:
+        rng = default_rng()
+    if exact:
+        return rng.integers(0, 2, size=(n, rounds))
+    return rng.standard_normal((n, rounds))
+
+def freivalds(A : ndarray, B : ndarray, C : ndarray, rounds : Optional[int] = 10,
+              rtol : Optional[float] = None, rng : Optional[Generator] = None) -> bool:
+    """
+    Probabilistically verify C = AB in O(n^2) using Freivalds' algorithm
+
+    Instead of recomputing AB in O(n^3), every round multiplies a random vector r from the right, i.e. compares
+    A(Br) with Cr, which only takes matrix-vector products. All rounds are carried out at once by stacking the
+    probes into a (p x rounds) matrix. If all of ``A``, ``B`` and ``C`` are integer matrices, the comparison is
+    exact and a wrong product passes a single round with probability at most 1/2, thus at most 2^-rounds overall.
+    For floating point matrices a round fails, if the probed residual exceeds ``rtol`` * |A| * |B| * |r|, which
+    accounts for the rounding errors of the product itself (by default ``rtol`` = 10 m eps for the inner
+    dimension m, see ``tolerance``).
+
+    If the shapes of ``A``, ``B`` and ``C`` do not fit together, a ValueError is raised.
+    """
+    n, ma = A.shape
+    mb, p = B.shape
+
+    if ma != mb or C.shape != (n, p):
+        raise ValueError('dimension mismatch between A, B and C')
+
+    exact = all(issubdtype(M.dtype, integer) for M in (A, B, C))
+    r = sketch(p, rounds, rng, exact)
+    lhs = A @ (B @ r)
+    rhs = C @ r
+
+    if exact:
+        return array_equal(lhs, rhs)
+    tol = tolerance(rtol, ma) * norm(A) * norm(B) * norm(r, axis=0)
+    return bool((norm(lhs - rhs, axis=0) <= tol).all())
+
+def verify_solution(A : ndarray, x : ndarray, b : ndarray, rounds : Optional[int] = 10,
+                    rtol : Optional[float] = None, rng : Optional[Generator] = None) -> bool:
+    """
+    Verify that ``x`` solves Ax = b by sketching the residual from the left
+
+    The residual Ax - b is compressed to S^T(Ax - b) = (S^T A)x - S^T b with a random (n x rounds) sketch S, so
+    ``x`` and ``b`` may hold several right-hand sides as columns without increasing the O(n^2) cost. The check
+    is relative to |A| * |x| + |b| per column, i.e. it bounds the backward error of the solution (by default
+    with ``rtol`` = 10 m eps).
+    """
+    n, m = A.shape
+
+    if x.shape[0] != m or b.shape[0] != n:
+        raise ValueError('dimension mismatch between A, x and b')
+
+    S = sketch(n, rounds, rng)
+    residual = (S.T @ A) @ x - S.T @ b
+    tol = tolerance(rtol, m) * norm(S, axis=0).max() * (norm(A) * norm(x, axis=0) + norm(b, axis=0))
+    return bool((norm(residual, axis=0) <= tol).all())
+
+def verify_LUP(A : ndarray, L : ndarray, U : ndarray, P : ndarray, rounds : Optional[int] = 10,
+               rtol : Optional[float] = None, rng : Optional[Generator] = None) -> bool:
+    """
+    Verify the factorization PA = LU as computed by ``LUP`` with Freivalds-probes
+    """
+    r = sketch(A.shape[1], rounds, rng)
+    lhs = P @ (A @ r)
+    rhs = L @ (U @ r)
+    tol = tolerance(rtol, A.shape[1]) * (norm(A) + norm(L) * norm(U)) * norm(r, axis=0)
+    return bool((norm(lhs - rhs, axis=0) <= tol).all())
+
+def verify_cholesky(A : ndarray, L : ndarray, rounds : Optional[int] = 10, rtol : Optional[float] = None,
+                    rng : Optional[Generator] = None) -> bool:
+    """
+    Verify the factorization A = LL^T as computed by ``CholeskyDecom`` with Freivalds-probes
+    """
+    r = sketch(A.shape[1], rounds, rng)
+    lhs = A @ r
+    rhs = L @ (L.T @ r)
+    tol = tolerance(rtol, A.shape[1]) * (norm(A) + norm(L)**2) * norm(r, axis=0)
+    return bool((norm(lhs - rhs, axis=0) <= tol).all())
+
+def verify_QR(A : ndarray, Q : ndarray, R : ndarray, rounds : Optional[int] = 10,
+              rtol : Optional[float] = None, rng : Optional[Generator] = None) -> bool:
+    """
+    Verify the factorization A = QR and the orthogonality of the columns of ``Q`` with Freivalds-probes
+
+    Besides A r = Q(Rr), also Q^T(Qs) = s is probed for random s, since a non-orthogonal Q would still
+    reproduce A and thus go unnoticed otherwise. Works for full (mxm) as well as thin (mxn) ``Q``.
+    """
+    rtol = tolerance(rtol, A.shape[0])
+    r = sketch(A.shape[1], rounds, rng)
+    s = sketch(Q.shape[1], rounds, rng)
+    lhs = A @ r
+    rhs = Q @ (R @ r)
+    tol = rtol * (norm(A) + norm(Q) * norm(R)) * norm(r, axis=0)
+    orth = Q.T @ (Q @ s) - s
+    return bool((norm(lhs - rhs, axis=0) <= tol).all()
+                and (norm(orth, axis=0) <= rtol * norm(Q)**2 * norm(s, axis=0)).all())
+
+def Sampled(f : Callable[[ndarray, ndarray], ndarray], rate : Optional[float] = 0.01,
+            rng : Optional[Generator] = None, **kwargs) -> Callable[[ndarray, ndarray], ndarray]:
+    """
+    Wrap the solver ``f`` such that a random fraction ``rate`` of its results is verified with ``verify_solution``
+
+    The returned function has the same signature as ``f``. If a sampled solution fails the verification, a
+    ValueError is raised instead of returning the faulty result. Any further kwargs (rounds, rtol) are passed
+    on to ``verify_solution``. A check costs O(n^2), thus with the default rate of 1% the overhead on the
+    O(n^3) solvers is negligible and the wrapper may stay enabled in production.
+    """
+    if rng is None:
+        rng = default_rng()
+
+    def checked(A : ndarray, b : ndarray) -> ndarray:
+        x = f(A, b)
+        if rng.random() < rate and not verify_solution(A, x, b, rng=rng, **kwargs):
+            raise ValueError(f'solution returned by {getattr(f, "__name__", f)} failed verification')
+        return x
+    return checked
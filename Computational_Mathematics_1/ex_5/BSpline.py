@@ -0,0 +1,155 @@
+"""
+author        : Moritz Mossböck | 11820925 | moritz.mossboeck@student.tugraz.at
+file          : BSpline.py      | UTF-8
+target version: Python 3.10.8   | 64-bit
+course        : Computational Mathematics 1
+"""
+
+# ----------------------------------------------------------------------------------------------------------------------
+#                                                   IMPORT SECTION
+# ----------------------------------------------------------------------------------------------------------------------
+from __future__ import annotations
+from numpy import zeros, float64, ndarray, sqrt, array, asarray, concatenate as concat, searchsorted, clip, \
+    bincount, arange, diff, sum, ones
+from math import comb
+from typing import Optional, Tuple
+
+# project imports
+from common import cholesky_banded, solve_banded_cholesky
+
+# ----------------------------------------------------------------------------------------------------------------------
+#                                                       CLASS
+# ----------------------------------------------------------------------------------------------------------------------
+
+
+class BSplineFitter:
+    """
+    Least squares fit of a spline of degree k with the given knots, represented in the B-spline basis
+
+    The knots t_0 < ... < t_K are extended by k copies of each boundary knot, which gives K + k basis functions
+    B_j, and at every point x only the k+1 functions B_(i-k),...,B_i of the knot interval containing x are
+    non-zero. Thus the normal matrix B^T B of the (n x K+k) design matrix is banded with bandwidth k, it is
+    assembled from the n (k+1) non-zero entries in O(n k^2) and factored with the banded cholesky decomposition
+    in O(K k^2), instead of O(n K^2) and O(K^3) for a dense matrix.
+
+    With ``penalty`` lambda > 0 the sum of squared ``order``-th differences of the coefficients is added to the
+    residual sum of squares (P-splines), which smoothes the fit and keeps the system regular even if some knot
+    intervals contain no data. The penalty widens the band to max(k, order).
+
+    Like ``Fitter``, the x-values are passed to the constructor, which builds and factors the normal matrix once,
+    so that ``PolyFit`` only assembles the right-hand side and solves the banded system for each y.
+    """
+
+    def __init__(self, x_data: ndarray, knots: ndarray, k: Optional[int] = 3, penalty: Optional[float] = 0.0,
+                 order: Optional[int] = 2) -> None:
+        knots = array(knots).astype(float64)
+        if len(knots) < 2 or (diff(knots) <= 0.0).any():
+            raise ValueError('need at least two strictly increasing knots')
+        self.x = array(x_data).astype(float64)
+        self.n = len(self.x)
+        self.k = k
+        self.t = concat((knots[0] * ones(k), knots, knots[-1] * ones(k)))
+        self.m = len(knots) + k - 1
+        self.c = None
+
+        self.values, self.first = self.basis(self.x)
+        p = max(k, order) if penalty > 0.0 else k
+        A = zeros((p + 1, self.m), dtype=float64)
+        for d in range(k + 1):
+            for a in range(k + 1 - d):
+                A[d] += bincount(self.first + a, self.values[:, a] * self.values[:, a + d], minlength=self.m)
+        if penalty > 0.0:
+            A += penalty * difference_penalty(self.m, order, p)
+        self.L = cholesky_banded(A)
+
+    # special methods
+    def __call__(self, x: float | ndarray) -> float | ndarray:
+        """
+        Evaluate the fitted spline, outside of the knots the polynomials of the boundary intervals are continued
+        """
+        if self.c is None:
+            raise ValueError('no data has been fitted yet')
+        x = asarray(x, dtype=float64)
+        values, first = self.basis(x.ravel())
+        s = zeros((len(first),) + self.c.shape[1:], dtype=float64)
+        for a in range(self.k + 1):
+            s += values[:, a].reshape((-1,) + (1,) * (self.c.ndim - 1)) * self.c[first + a]
+        return s.reshape(x.shape + self.c.shape[1:])
+
+    # basis
+    def basis(self, x: ndarray) -> Tuple[ndarray, ndarray]:
+        """
+        Evaluate the non-zero B-splines at all points at once with the Cox-de Boor recursion
+
+        Returns the (len(x) x k+1) values B_(i-k)(x),...,B_i(x) and the index i-k of the first one for each point,
+        where the knot interval [t_i, t_(i+1)) is found by bisection (``searchsorted``). Every step of the
+        recursion raises the degree by one and is a single array operation over all points.
+        """
+        k = self.k
+        span = clip(searchsorted(self.t, x, 'right') - 1, k, self.m - 1)
+        N = zeros((len(x), k + 1), dtype=float64)
+        N[:, 0] = 1.0
+        left = zeros((len(x), k + 1), dtype=float64)
+        right = zeros((len(x), k + 1), dtype=float64)
+        for j in range(1, k + 1):
+            left[:, j] = x - self.t[span + 1 - j]
+            right[:, j] = self.t[span + j] - x
+            saved = 0.0
+            for r in range(j):
+                temp = N[:, r] / (right[:, r + 1] + left[:, j - r])
+                N[:, r] = saved + right[:, r + 1] * temp
+                saved = left[:, j - r] * temp
+            N[:, j] = saved
+        return N, span - k
+
+    # fitting
+    def PolyFit(self, y_data: ndarray) -> ndarray:
+        """
+        Fit the spline to the supplied y-values (or to every column of a (n x k) matrix) and return the
+        coefficients of the B-splines
+        """
+        y = array(y_data).astype(float64)
+        if len(y) != self.n:
+            raise ValueError(f'invalid y-values passed, need {self.n} != {len(y)}')
+
+        columns = y.reshape(self.n, -1)
+        b = zeros((self.m, columns.shape[1]), dtype=float64)
+        for a in range(self.k + 1):
+            for i in range(columns.shape[1]):
+                b[:, i] += bincount(self.first + a, self.values[:, a] * columns[:, i], minlength=self.m)
+        self.c = solve_banded_cholesky(self.L, b.reshape((self.m,) + y.shape[1:]))
+        return self.c
+
+    # misc
+    def residues(self, y_data: ndarray) -> ndarray:
+        """
+        Compute the residues of the fitted spline and the supplied y-values
+        """
+        return y_data - self(self.x)
+
+    def StdDev(self, y_data: ndarray) -> float | ndarray:
+        """
+        Compute the standard deviation of the fitted spline to the given y_data
+        """
+        r = self.residues(y_data)
+        return sqrt(sum(r * r, axis=0) / (self.n - self.m))
+
+
+# ----------------------------------------------------------------------------------------------------------------------
+#                                                  HELPER FUNCTIONS
+# ----------------------------------------------------------------------------------------------------------------------
+
+def difference_penalty(m: int, order: int, p: int) -> ndarray:
+    """
+    Return D^T D in banded storage with p+1 diagonals, where D is the ((m-order) x m) matrix of order-th differences
+
+    Row r of D holds the stencil w_a = (-1)^(order-a) binom(order, a) in the columns r,...,r+order, hence
+    (D^T D)[r+a+d, r+a] collects w_a w_(a+d) from every row r.
+    """
+    w = array([(-1)**(order - a) * comb(order, a) for a in range(order + 1)], dtype=float64)
+    rows = arange(m - order)
+    P = zeros((p + 1, m), dtype=float64)
+    for d in range(order + 1):
+        for a in range(order + 1 - d):
+            P[d] += bincount(rows + a, w[a] * w[a + d] * ones(len(rows)), minlength=m)
+    return P
@@ -10,17 +10,21 @@ course        : Computational Mathematics 1
 #                                                   IMPORT SECTION
 # ----------------------------------------------------------------------------------------------------------------------
 from __future__ import annotations
-from numpy import zeros, float64, ndarray, sum, sqrt, linspace, min, max, array, dot
+from numpy import zeros, float64, ndarray, sum, sqrt, linspace, min, max, array, ones, argmin, arange, cumprod, \
+    column_stack as colstack, inf
 from numpy.linalg import norm
+from numpy.random import default_rng
+from concurrent.futures import ProcessPoolExecutor
+from os import cpu_count
 from typing import Optional, List, Tuple
 from matplotlib.pyplot import Axes
 from matplotlib.lines import Line2D
 
 # project imports
-from QR import QR
+from QR import QR, CompactQR
 from gauss import GaussElim
 from common import backsubs
-from Polynomial import Polynomial
+from Polynomial import Polynomial, PolynomialArray
 
 # ----------------------------------------------------------------------------------------------------------------------
 #                                                       CLASS
@@ -34,6 +38,7 @@ class Fitter:
         self.x = array(x_data).astype(float64)
         self.single = single
         self.f = Polynomial([1.0])
+        self.qr = None  # factorization of the design matrix, set by find_best in sweep mode
 
         if not single:
             self.Q, self.R = QR(compute_normal_matrix(x_data, self.m ))
@@ -50,14 +55,23 @@ class Fitter:
         """
         Fit a polynomial of degree m to the supplied y-values. If the instance is in single-mode, then gaussian 
         elimination is used for solving Ac=b. Else the constructor has already perfomred a QR-decomposition
-        of A and c is solved via backward-substitution
+        of A and c is solved via backward-substitution. If the instance holds a QR-decomposition of the
+        vandermonde matrix (see ``find_best``), the least squares problem is solved with it directly.
+
+        If ``y_data`` is a (n x k) matrix, every column is fitted as a separate series. The factorization is
+        applied to all k right-hand sides at once, the coefficients are returned as (m x k) matrix and the
+        fitted function becomes a ``PolynomialArray`` of the k polynomials.
         """
         if self.n != len(y_data):
             raise ValueError(
-                f'invalid y-values passed, need {self.n} != {len(y)}')
+                f'invalid y-values passed, need {self.n} != {len(y_data)}')
+
+        if self.qr is not None:
+            c = self.qr.solve(y_data)
+            self.f = Polynomial(c) if c.ndim == 1 else PolynomialArray(c.T)
+            return c
 
         b = compute_normal_vector(self.x, y_data, self.m )
-        c = zeros(self.m, dtype=float64)
 
         if self.single:
             c = GaussElim(compute_normal_matrix(self.x, self.m), b)
@@ -65,22 +79,24 @@ class Fitter:
             y = self.Q.T @ b
             c = backsubs(self.R, y)
 
-        self.f = Polynomial(c)
+        self.f = Polynomial(c) if c.ndim == 1 else PolynomialArray(c.T)
         return c
 
     # misc
     def residues(self, y_data: ndarray) -> ndarray:
         """
-        Compute the residues of the fitted function and the supplied y-values
+        Compute the residues of the fitted function and the supplied y-values (one column per series)
         """
         return y_data - self(self.x)
 
     def StdDev(self, y_data) -> float:
         """
         Compute the standard deviation of the current fitted function to the given y_data
+
+        For a (n x k) matrix of series, the k standard deviations are returned.
         """
         r = self.residues(y_data)
-        S = dot(r, r)
+        S = sum(r * r, axis=0)
         return sqrt(S / (self.n - self.m + 1))
 
     def PlotPoly(self, ax: Axes, y_data: Optional[ndarray] = None) -> Line2D:
@@ -99,7 +115,8 @@ class Fitter:
     # static methods
 
     @staticmethod
-    def find_best(x_data: ndarray, y_data: ndarray, aux: Optional[bool] = False) -> Fitter | Tuple[Fitter, List[Fitter]]:
+    def find_best(x_data: ndarray, y_data: ndarray, aux: Optional[bool] = False,
+                  sweep: Optional[bool] = False) -> Fitter | Tuple[Fitter, List[Fitter]]:
         """
         Find the Fitter-instance with minimum standard deviation and return it
 
@@ -109,6 +126,7 @@ class Fitter:
             | x_data | ndarray[float64]| n    | false    | x-values for the supplied y-values             |
             | y_data | ndarray[float64]| n    | false    | y-values of the function at the given x-values |
             | aux    | boolean         |      | true     | return all generated fitting polynomials       |
+            | sweep  | boolean         |      | true     | use a single QR-decomposition for all degrees  |
 
         Outputs:
             | name         | type         | description                                    |
@@ -120,9 +138,30 @@ class Fitter:
         or not the standard deviation for the given y-values is less than the current minimum. If that is the 
         case the old minimum instance is deleted and the current instance is set as the new minimum. Note that 
         if aux is True, then the instance is copied to the instances array first.
+
+        In sweep mode the vandermonde matrix is factored column by column with ``degree_sweep`` instead, in
+        O(n^3) total. Every degree is fitted with the shared factorization in O(n^2) and scored by the standard
+        deviation of its actual fit. The residual norms |z[d+1:]| of the sweep are not used: for ill-conditioned
+        monomial bases they keep shrinking with the degree, while the computed coefficients do not achieve them.
+        Since the QR-based fits stay accurate to higher degrees than the normal equations, sweep mode may still
+        select a higher degree than the default path, but its standard deviation is the one the fit achieves.
         """
         n = len(x_data)
 
+        if sweep:
+            _, F = Fitter.degree_sweep(x_data, y_data)
+            instances = [None] * F.n
+            sigmas = zeros(F.n, dtype=float64)
+            for d in range(F.n):
+                instances[d] = Fitter(x_data, d, True)
+                instances[d].qr = F.leading(d + 1)
+                instances[d].single = False
+                instances[d].PolyFit(y_data)
+                sigmas[d] = instances[d].StdDev(y_data)
+            if aux:
+                return instances[argmin(sigmas)], instances
+            return instances[argmin(sigmas)]
+
         min_instance = Fitter(x_data, 0)
         min_instance.PolyFit(y_data)
         min_sigma = min_instance.StdDev(y_data)
@@ -151,6 +190,113 @@ class Fitter:
         return min_instance
 
 
+    @staticmethod
+    def degree_sweep(x_data: ndarray, y_data: ndarray, max_degree: Optional[int] = None) -> Tuple[ndarray, CompactQR]:
+        """
+        Compute the residual norms of the least squares polynomials of degree 0,...,max_degree in a single pass
+
+        The vandermonde matrix [1, x, x^2, ...] is factored by appending one column per degree to a
+        ``CompactQR``, and the same reflectors are applied to z = Q^T y one at a time. Since the first d+1 columns
+        of Q span the polynomials of degree d, the residual norm of the degree d fit is |z[d+1:]|. The total cost
+        is O(n * max_degree^2), instead of one full fit per degree. If max_degree is None, n-2 is used.
+
+        Returns the array of residual norms and the factorization, whose ``leading(d+1)`` solves the degree d fit.
+        """
+        n = len(x_data)
+        if max_degree is None:
+            max_degree = n - 2
+        x = array(x_data).astype(float64)
+
+        column = ones(n, dtype=float64)
+        F = CompactQR(column[:, None])
+        z = F.apply_QT(y_data)
+        residues = zeros(max_degree + 1, dtype=float64)
+        residues[0] = norm(z[1:])
+
+        for d in range(1, max_degree + 1):
+            column = column * x
+            F.append(column)
+            v = F.V[d:, d]
+            z[d:] -= F.tau[d] * (v @ z[d:]) * v   # apply only the newest reflector
+            residues[d] = norm(z[d+1:])
+        return residues, F
+
+
+    @staticmethod
+    def find_best_cv(x_data: ndarray, y_data: ndarray, folds: Optional[int] = 5, max_degree: Optional[int] = None,
+                     patience: Optional[int] = 3, workers: Optional[int] = None,
+                     seed: Optional[int] = None) -> Tuple[Fitter, dict]:
+        """
+        Select the degree with minimum k-fold cross-validated error and return its fit on the whole dataset
+
+        Inputs:
+            | name       | type            | size | optional | description                                      |
+            |------------|-----------------|------|----------|--------------------------------------------------|
+            | x_data     | ndarray[float64]| n    | false    | x-values for the supplied y-values               |
+            | y_data     | ndarray[float64]| n    | false    | y-values of the function at the given x-values   |
+            | folds      | int             |      | true     | number of folds k                                |
+            | max_degree | int             |      | true     | highest tested degree (default: smallest fold-1) |
+            | patience   | int             |      | true     | stop after this many degrees without improvement |
+            | workers    | int             |      | true     | number of processes (default: cpus)              |
+            | seed       | int             |      | true     | seed for the random assignment of folds          |
+
+        Outputs:
+            | name     | type   | description                                                          |
+            |----------|--------|----------------------------------------------------------------------|
+            | instance | Fitter | fit of the selected degree on all data                               |
+            | summary  | dict   | tested degrees, mean and std of the validation error, chosen degree  |
+
+        In contrast to ``find_best``, which minimizes the in-sample standard deviation and thus favours
+        overfitting, every degree is fitted on k-1 folds and scored by the mean squared error on the remaining
+        fold. The (degree, fold) pairs are evaluated in a process pool, the data is sent to every worker only
+        once. Degrees are scheduled in increasing order with a lookahead that keeps all workers busy; as soon as
+        the mean validation error has not improved for ``patience`` consecutive degrees, the pending tasks are
+        cancelled. Only the error statistics are kept, not the candidate fits.
+        """
+        x = array(x_data).astype(float64)
+        y = array(y_data).astype(float64)
+        n = len(x)
+        if folds < 2 or folds > n:
+            raise ValueError(f'invalid number of folds {folds} for {n} data points')
+
+        assignment = default_rng(seed).permutation(n) % folds
+        if max_degree is None:
+            max_degree = n - (n + folds - 1) // folds - 1
+        workers = workers or cpu_count()
+        lookahead = -(-workers // folds)  # degrees scheduled ahead, such that all workers are busy
+
+        degrees, means, stds = [], [], []
+        best, best_degree, rises = inf, 0, 0
+        pending = {}
+        with ProcessPoolExecutor(workers, initializer=share_data, initargs=(x, y, assignment)) as pool:
+            scheduled = 0
+            for d in range(max_degree + 1):
+                while scheduled <= max_degree and scheduled <= d + lookahead:
+                    pending[scheduled] = [pool.submit(validation_error, scheduled, k) for k in range(folds)]
+                    scheduled += 1
+                errors = array([future.result() for future in pending.pop(d)])
+                degrees.append(d)
+                means.append(errors.mean())
+                stds.append(errors.std())
+
+                if means[-1] < best:
+                    best, best_degree, rises = means[-1], d, 0
+                else:
+                    rises += 1
+                    if rises >= patience:
+                        break
+            for futures in pending.values():
+                for future in futures:
+                    future.cancel()
+
+        instance = Fitter(x, best_degree, True)
+        instance.qr = CompactQR(vandermonde(x, best_degree + 1))
+        instance.single = False
+        instance.PolyFit(y)
+        summary = {'degrees': array(degrees), 'mean': array(means), 'std': array(stds), 'degree': best_degree}
+        return instance, summary
+
+
 # ----------------------------------------------------------------------------------------------------------------------
 #                                                  HELPER FUNCTIONS
 # ----------------------------------------------------------------------------------------------------------------------
@@ -158,20 +304,70 @@ class Fitter:
 def compute_normal_matrix(x_data: ndarray, m: Optional[int] = 5) -> ndarray:
     """
     Computes the matrix for normal equations when using polynomials for fitting
+
+    The entry (i,k) is the power sum sum(x^(i+k)), which only depends on i+k. Thus only the 2m-1 power sums are
+    computed (in O(nm)) and arranged as a hankel matrix.
+    """
+    return hankel(power_sums(x_data, 2 * m - 1), m)
+
+
+def power_sums(x_data: ndarray, p: int) -> ndarray:
+    """
+    Computes the power sums sum(x^k) for k = 0,...,p-1 using repeated multiplication instead of exponentiation
+    """
+    x = array(x_data).astype(float64)
+    s = zeros(p, dtype=float64)
+    power = ones(len(x), dtype=float64)
+    for k in range(p):
+        s[k] = sum(power)
+        power *= x
+    return s
+
+
+def hankel(s: ndarray, m: int) -> ndarray:
+    """
+    Arrange the 2m-1 values of ``s`` as the (m x m) hankel matrix A[i,k] = s[i+k]
     """
-    A = zeros((m, m), dtype=float64)
-    for i in range(m):
-        for k in range(m):
-            A[i, k] = sum(x_data**(i+k))
-    return A
+    index = arange(m)
+    return s[index[:, None] + index[None, :]]
 
 
 def compute_normal_vector(x_data: ndarray, y_data: ndarray, m: Optional[int] = 5) -> ndarray:
     """
     Computes the b-vector for the normal equations given x_data and y_data
+
+    The moments sum(x^i y) are computed as one product V^T y with the (n x m) vandermonde matrix V, thus for a
+    (n x k) matrix of y-values the (m x k) matrix of all k b-vectors is returned.
+    """
+    return vandermonde(x_data, m).T @ array(y_data).astype(float64)
+
+
+def vandermonde(x_data: ndarray, m: int) -> ndarray:
+    """
+    Computes the (n x m) vandermonde matrix [1, x, ..., x^(m-1)] by cumulative products
+    """
+    x = array(x_data).astype(float64)
+    return cumprod(colstack((ones(len(x)), x[:, None].repeat(m - 1, axis=1))), axis=1)
+
+
+# data of the cross-validation, set once per worker process by ``share_data``
+_cv_data = None
+
+
+def share_data(x_data: ndarray, y_data: ndarray, assignment: ndarray) -> None:
+    """
+    Store the dataset and the fold of every data point in a worker process of ``Fitter.find_best_cv``
+    """
+    global _cv_data
+    _cv_data = (x_data, y_data, assignment)
+
+
+def validation_error(degree: int, fold: int) -> float:
+    """
+    Fit a polynomial of the given degree to all folds except ``fold`` and return its mean squared error on ``fold``
     """
-    b = zeros(m, dtype=float64)
-    n = len(x_data)
-    for i in range(m):
-        b[i] = sum([(x_data[j]**i)*y_data[j] for j in range(n)])
-    return b
+    x, y, assignment = _cv_data
+    train = assignment != fold
+    c = CompactQR(vandermonde(x[train], degree + 1)).solve(y[train])
+    r = y[~train] - Polynomial(c)(x[~train])
+    return sum(r * r) / len(r)
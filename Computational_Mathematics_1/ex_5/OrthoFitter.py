@@ -0,0 +1,165 @@
+"""
+author        : Moritz Mossböck | 11820925 | moritz.mossboeck@student.tugraz.at
+file          : OrthoFitter.py  | UTF-8
+target version: Python 3.10.8   | 64-bit
+course        : Computational Mathematics 1
+"""
+
+# ----------------------------------------------------------------------------------------------------------------------
+#                                                   IMPORT SECTION
+# ----------------------------------------------------------------------------------------------------------------------
+from __future__ import annotations
+from numpy import zeros, float64, ndarray, sqrt, array, ones, asarray, min, max, sum
+from typing import Optional
+
+# project imports
+from Polynomial import Polynomial
+
+# ----------------------------------------------------------------------------------------------------------------------
+#                                                       CLASS
+# ----------------------------------------------------------------------------------------------------------------------
+
+
+class OrthoFitter:
+    """
+    Polynomial least squares fit in the basis of polynomials orthogonal on the data points (Forsythe's method)
+
+    The polynomials are generated by the three-term recurrence
+
+        p_0 = 1,    p_(j+1)(u) = (u - alpha_j) p_j(u) - beta_j p_(j-1)(u),
+        alpha_j = <u p_j, p_j> / <p_j, p_j>,    beta_j = <p_j, p_j> / <p_(j-1), p_(j-1)>
+
+    where <f, g> = sum f(u_i) g(u_i) over the data points, mapped to u in [-1,1]. Since the basis is orthogonal,
+    the least squares coefficients are simply c_j = <y, p_j> / <p_j, p_j>, which costs O(nm) for all degrees up to
+    m without any linear solve, and the condition number does not explode with the degree as it does for the
+    monomial normal matrix. Raising the degree by one (``add_degree``) costs O(n).
+
+    Only the recurrence coefficients and the last two basis vectors are stored. The fit is evaluated with
+    Clenshaw's algorithm, ``to_polynomial`` converts it into a ``Polynomial`` in x.
+    """
+
+    def __init__(self, x_data: ndarray, m: Optional[int] = 5) -> None:
+        self.x = array(x_data).astype(float64)
+        self.n = len(self.x)
+        self.shift = (max(self.x) + min(self.x)) / 2
+        self.scale = (max(self.x) - min(self.x)) / 2 or 1.0
+        self.u = (self.x - self.shift) / self.scale
+
+        self.m = 1
+        self.alpha = []
+        self.beta = [0.0]
+        self.norms = [float(self.n)]
+        self.p_prev = zeros(self.n, dtype=float64)
+        self.p = ones(self.n, dtype=float64)
+        self.c = None
+        self.r = None
+
+        for _ in range(m):
+            self.add_degree()
+
+    # special methods
+    def __call__(self, x: float | ndarray) -> float | ndarray:
+        """
+        Evaluate the fit with Clenshaw's algorithm: b_j = c_j + (u - alpha_j) b_(j+1) - beta_(j+1) b_(j+2)
+        """
+        if self.c is None:
+            raise ValueError('no data has been fitted yet')
+        u = (asarray(x, dtype=float64) - self.shift) / self.scale
+        if self.c.ndim == 2:
+            u = u[..., None]
+        b1 = zeros(u.shape, dtype=float64) + self.c[-1]
+        b2 = 0.0
+        for j in reversed(range(self.m - 1)):
+            b1, b2 = self.c[j] + (u - self.alpha[j]) * b1 - self.beta[j+1] * b2, b1
+        return b1
+
+    def __str__(self) -> str:
+        return str(self.to_polynomial())
+
+    # fitting
+    def add_degree(self) -> None:
+        """
+        Extend the basis (and the current fit, if any) by the polynomial of the next degree in O(n)
+        """
+        if self.m >= self.n:
+            raise ValueError(f'degree {self.m} is too high for {self.n} data points')
+        alpha = sum(self.u * self.p * self.p) / self.norms[-1]
+        p_next = (self.u - alpha) * self.p - self.beta[-1] * self.p_prev
+        norm = sum(p_next * p_next)
+        if norm == 0.0:
+            raise ValueError(f'data points only determine polynomials up to degree {self.m - 1}')
+
+        self.alpha.append(alpha)
+        self.beta.append(norm / self.norms[-1])
+        self.norms.append(norm)
+        self.p_prev, self.p = self.p, p_next
+        self.m += 1
+
+        if self.c is not None:
+            c = (p_next @ self.r) / norm
+            self.r -= p_next[:, None] * c if self.r.ndim == 2 else p_next * c
+            self.c = array(list(self.c) + [c])
+
+    def PolyFit(self, y_data: ndarray) -> ndarray:
+        """
+        Fit the supplied y-values (or the columns of a (n x k) matrix) and return the coefficients c_j of the fit
+        with respect to the orthogonal basis
+
+        The basis is regenerated by the recurrence, and every coefficient is projected from the current residual
+        (as in modified Gram-Schmidt), which keeps the coefficients accurate even if orthogonality slowly
+        degrades in floating point arithmetic.
+        """
+        y = array(y_data).astype(float64)
+        if len(y) != self.n:
+            raise ValueError(f'invalid y-values passed, need {self.n} != {len(y)}')
+
+        self.r = y.copy()
+        self.c = zeros((self.m,) + y.shape[1:], dtype=float64)
+        p_prev = zeros(self.n, dtype=float64)
+        p = ones(self.n, dtype=float64)
+        for j in range(self.m):
+            if j > 0:
+                p_prev, p = p, (self.u - self.alpha[j-1]) * p - self.beta[j-1] * p_prev
+            self.c[j] = (p @ self.r) / self.norms[j]
+            self.r -= p[:, None] * self.c[j] if y.ndim == 2 else p * self.c[j]
+        return self.c
+
+    # misc
+    def residues(self) -> ndarray:
+        """
+        Return the residues of the current fit to the fitted y-values
+        """
+        return self.r
+
+    def StdDev(self) -> float | ndarray:
+        """
+        Compute the standard deviation of the current fit to the fitted y-values
+        """
+        return sqrt(sum(self.r * self.r, axis=0) / (self.n - self.m + 1))
+
+    def to_polynomial(self) -> Polynomial:
+        """
+        Convert the current fit into a ``Polynomial`` in x with monomial coefficients
+
+        The monomial coefficients of each p_j (in u) follow from the recurrence in O(m^2), substituting
+        u = (x - shift) / scale is done with horner's scheme on polynomials. Note that for high degrees the
+        monomial representation is much worse conditioned than the orthogonal one.
+        """
+        if self.c is None or self.c.ndim != 1:
+            raise ValueError('only a single fitted series can be converted')
+        a = zeros(self.m, dtype=float64)
+        P_prev = zeros(self.m, dtype=float64)
+        P = zeros(self.m, dtype=float64)
+        P[0] = 1.0
+        for j in range(self.m):
+            if j > 0:
+                P_next = -self.alpha[j-1] * P - self.beta[j-1] * P_prev
+                P_next[1:] += P[:-1]
+                P_prev, P = P, P_next
+            a += self.c[j] * P
+
+        u = Polynomial([-self.shift / self.scale, 1.0 / self.scale])
+        f = Polynomial([a[-1]])
+        for ak in reversed(a[:-1]):
+            f = f * u + Polynomial([ak])
+        return f
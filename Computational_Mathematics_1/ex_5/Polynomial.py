@@ -10,8 +10,10 @@ course        : Computational Mathematics 1
 #                                                   IMPORT SECTION
 # ----------------------------------------------------------------------------------------------------------------------
 from __future__ import annotations  # just for return-type hinting in some methods
-from numpy import ndarray, pad, flip, trim_zeros, float64, polyval, zeros, array
-from typing import Iterator, Optional, Tuple
+from numpy import ndarray, pad, flip, trim_zeros, float64, polyval, zeros, array, asarray, atleast_2d, convolve, \
+    arange, concatenate as concat, integer
+from numpy.fft import rfft, irfft
+from typing import Iterable, Iterator, Optional, Tuple
 
 # ----------------------------------------------------------------------------------------------------------------------
 #                                                       CLASS
@@ -19,6 +21,9 @@ from typing import Iterator, Optional, Tuple
 
 
 class Polynomial:
+    # above this number of coefficients (of both factors) products are computed by FFT convolution
+    FFT_THRESHOLD = 64
+
     def __init__(self, coefficients: ndarray) -> None:
         self.coefficients = trim_zeros(array(coefficients).astype(float64), 'b')
 
@@ -56,12 +61,16 @@ class Polynomial:
         return Polynomial(c1 - c2)
 
     def __mul__(self, other: Polynomial) -> Polynomial:
-        m = len(self.coefficients) + len(other.coefficients) - 1
-        ck = zeros(m)
-        for i, ak in enumerate(self.coefficients):
-            for j, bk in enumerate(other.coefficients):
-                ck[i + j] += ak * bk
-        return Polynomial(ck)
+        return Polynomial(multiply(self.coefficients, other.coefficients))
+
+    def mul_trunc(self, other: Polynomial, n: int) -> Polynomial:
+        """
+        Return the product modulo x^n, i.e. only its first n coefficients (as needed for power series)
+
+        Coefficients of degree n or higher of the factors cannot contribute, thus they are cut off before
+        multiplying.
+        """
+        return Polynomial(multiply(self.coefficients[:n], other.coefficients[:n])[:n])
 
     def __neg__(self) -> Polynomial:
         return Polynomial(-self.coefficients)
@@ -69,11 +78,170 @@ class Polynomial:
     def __eq__(self, other: Polynomial) -> bool:
         return self.coefficients == other.coefficients
 
+    # calculus
+    def derivative(self, k: Optional[int] = 1) -> Polynomial:
+        """
+        Return the k-th derivative, each differentiation is a single vectorized multiplication
+        """
+        c = self.coefficients
+        for _ in range(k):
+            c = c[1:] * arange(1, len(c))
+        return Polynomial(c)
+
+    def integral(self, constant: Optional[float] = 0.0) -> Polynomial:
+        """
+        Return the antiderivative with value ``constant`` at x = 0
+        """
+        c = self.coefficients
+        return Polynomial(concat(([constant], c / arange(1, len(c) + 1))))
+
+    def compose(self, other: Polynomial) -> Polynomial:
+        """
+        Return the composition p(q(x)) of this polynomial p with ``other`` = q
+
+        Uses horner's scheme with polynomial coefficients, the intermediate products grow large enough for
+        FFT multiplication quickly.
+        """
+        if len(self.coefficients) == 0:
+            return Polynomial([0.0])
+        f = Polynomial(self.coefficients[-1:])
+        for a in reversed(self.coefficients[:-1]):
+            f = f * other + Polynomial([a])
+        return f
+
+
+class PolynomialArray:
+    """
+    Container for k polynomials, stored as one (k x d) array of coefficients in ascending order
+
+    Polynomials of lower degree are padded with zeros, such that all k polynomials are evaluated at once with
+    a single vectorized horner scheme, i.e. d array operations instead of k calls of ``Polynomial``. The
+    coefficients are not copied, if they already are a float64 array, and slicing (``P[i:j]``) returns a
+    view, thus modifying the coefficients of a slice modifies the original array as well.
+    """
+
+    def __init__(self, coefficients: ndarray) -> None:
+        self.coefficients = atleast_2d(asarray(coefficients, dtype=float64))
+
+    @classmethod
+    def from_polynomials(cls, polynomials: Iterable[Polynomial | ndarray]) -> PolynomialArray:
+        """
+        Pad the coefficients of polynomials of different degrees into one array
+        """
+        rows = [asarray(p.coefficients if isinstance(p, Polynomial) else p, dtype=float64) for p in polynomials]
+        c = zeros((len(rows), max([len(r) for r in rows] + [1])), dtype=float64)
+        for i, r in enumerate(rows):
+            c[i, :len(r)] = r
+        return cls(c)
+
+    # special methods
+    def __call__(self, x: Optional[float | ndarray] = 0.0, pairwise: Optional[bool] = False) -> ndarray:
+        """
+        Evaluate all polynomials at ``x``, the result has shape x.shape + (k,)
+
+        With ``pairwise`` every polynomial is evaluated at its own points instead, i.e. x has shape (k, ...) and
+        row i of x is passed to polynomial i, the result has the shape of x.
+        """
+        x = asarray(x, dtype=float64)
+        if pairwise:
+            if x.shape[:1] != (len(self),):
+                raise ValueError(f'need points for each of the {len(self)} polynomials, got shape {x.shape}')
+            c = self.coefficients.reshape(self.coefficients.shape + (1,) * (x.ndim - 1))
+            c = c.swapaxes(0, 1)  # c[j] holds the j-th coefficients, broadcastable against x
+        else:
+            x = x[..., None]
+            c = self.coefficients.T
+        value = zeros(x.shape if pairwise else x.shape[:-1] + (len(self),), dtype=float64) + c[-1]
+        for cj in c[-2::-1]:
+            value *= x
+            value += cj
+        return value
+
+    def __len__(self) -> int:
+        return self.coefficients.shape[0]
+
+    def __getitem__(self, i: int | slice | ndarray) -> Polynomial | PolynomialArray:
+        if isinstance(i, (int, integer)):
+            return Polynomial(self.coefficients[i])
+        return PolynomialArray(self.coefficients[i])
+
+    def __iter__(self) -> Iterator[Polynomial]:
+        for c in self.coefficients:
+            yield Polynomial(c)
+
+    def __str__(self) -> str:
+        return '\n'.join(str(p) for p in self)
+
+    # arithmetic, elementwise (a single polynomial is broadcast against all k)
+
+    def __add__(self, other: PolynomialArray | Polynomial) -> PolynomialArray:
+        c1, c2 = adapt_columns(self.coefficients, as_rows(other))
+        return PolynomialArray(c1 + c2)
+
+    def __sub__(self, other: PolynomialArray | Polynomial) -> PolynomialArray:
+        c1, c2 = adapt_columns(self.coefficients, as_rows(other))
+        return PolynomialArray(c1 - c2)
+
+    def __mul__(self, other: PolynomialArray | Polynomial) -> PolynomialArray:
+        return PolynomialArray(multiply_rows(self.coefficients, as_rows(other)))
+
+    def __neg__(self) -> PolynomialArray:
+        return PolynomialArray(-self.coefficients)
+
 
 # ----------------------------------------------------------------------------------------------------------------------
 #                                                  HELPER FUNCTIONS
 # ----------------------------------------------------------------------------------------------------------------------
 
+def multiply(c1: ndarray, c2: ndarray) -> ndarray:
+    """
+    Compute the coefficients of the product of two polynomials, i.e. the convolution of their coefficients
+
+    Short factors are convolved directly in O(nm). If both factors have more than ``Polynomial.FFT_THRESHOLD``
+    coefficients, the convolution is computed as pointwise product of their (real) FFTs padded to a power of two,
+    which costs O((n+m) log(n+m)). Note that the FFT bounds the error relative to the largest coefficient,
+    thus tiny coefficients of the product lose relative accuracy, if the magnitudes vary strongly.
+    """
+    n, m = len(c1), len(c2)
+    if n == 0 or m == 0:
+        return zeros(0)
+    if min(n, m) <= Polynomial.FFT_THRESHOLD:
+        return convolve(c1, c2)
+    size = 1 << (n + m - 2).bit_length()
+    return irfft(rfft(c1, size) * rfft(c2, size), size)[:n + m - 1]
+
+
+def multiply_rows(c1: ndarray, c2: ndarray) -> ndarray:
+    """
+    Row-wise product of the polynomials in two (broadcastable) coefficient arrays
+
+    Short factors are multiplied by adding one shifted row-scaled copy of c1 per coefficient of c2, i.e. O(d)
+    array operations for all rows at once, long ones by FFT along the rows (see ``multiply``).
+    """
+    k = max(c1.shape[0], c2.shape[0])
+    n, m = c1.shape[1], c2.shape[1]
+    if min(n, m) > Polynomial.FFT_THRESHOLD:
+        size = 1 << (n + m - 2).bit_length()
+        return irfft(rfft(c1, size, axis=1) * rfft(c2, size, axis=1), size, axis=1)[:, :n + m - 1]
+    if n < m:
+        c1, c2, n, m = c2, c1, m, n
+    c = zeros((k, n + m - 1), dtype=float64)
+    for j in range(m):
+        c[:, j:j+n] += c1 * c2[:, j:j+1]
+    return c
+
+
+def as_rows(p: PolynomialArray | Polynomial) -> ndarray:
+    if isinstance(p, Polynomial):
+        return atleast_2d(p.coefficients) if len(p.coefficients) else zeros((1, 1))
+    return p.coefficients
+
+
+def adapt_columns(c1: ndarray, c2: ndarray) -> Tuple[ndarray, ndarray]:
+    d = max(c1.shape[1], c2.shape[1])
+    return pad(c1, ((0, 0), (0, d - c1.shape[1]))), pad(c2, ((0, 0), (0, d - c2.shape[1])))
+
+
 def adapt_coefficients(c1: ndarray, c2: ndarray) -> Tuple[ndarray, ndarray]:
     n = len(c1)
     m = len(c2)
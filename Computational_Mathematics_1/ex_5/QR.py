@@ -9,12 +9,14 @@ course        : Computational Mathematics 1
 # ----------------------------------------------------------------------------------------------------------------------
 #                                                   IMPORT SECTION
 # ----------------------------------------------------------------------------------------------------------------------
-from numpy import ndarray, eye, outer, zeros, sign, float64, concatenate as concat
+from __future__ import annotations
+from numpy import ndarray, eye, outer, zeros, float64, array, triu, copysign, sqrt, hypot, arange, argmax, divide, \
+    maximum, where, finfo, concatenate
 from numpy.linalg import norm
-from typing import Union, Optional
+from typing import Union, Optional, List, Tuple
 
 # project imports
-from common import backsubs
+from common import backsubs, forwsubs
 
 
 # ----------------------------------------------------------------------------------------------------------------------
@@ -40,51 +42,332 @@ def QR(A : ndarray, b : Optional[ndarray] = None, **kwargs) -> Union[ndarray, nd
     Perform the QR-decomposition on A
     
     Inputs:
-        | name | type             | size | optional | description                                    |
-        |------|------------------|------|----------|------------------------------------------------|
-        | A    | ndarray[float64] | mxn  | false    | the matrix to be decomposed                    |
-        | b    | ndarray[float64] | n    | true     | Ax = b for a specific solution x               |
-        | mode | string           |      | true     | switches operation between solve and full mode |
+        | name     | type             | size     | optional | description                                    |
+        |----------|------------------|----------|----------|------------------------------------------------|
+        | A        | ndarray[float64] | mxn      | false    | the matrix to be decomposed                    |
+        | b        | ndarray[float64] | m or mxk | true     | Ax = b for a specific solution x               |
+        | mode     | string           |          | true     | one of full, economy and solve                 |
+        | pivoting | bool             |          | true     | use column pivoting (rank revealing)           |
+        | rcond    | float            |          | true     | relative cutoff for the numerical rank         |
 
     Outputs:
-        | name | type             | size | description                                    |
-        |------|------------------|------|------------------------------------------------|
-        | Q    | ndarray[float64] | mxm  | orthogonal component of QR decomposition       |
-        | R    | ndarray[float64] | mxn  | upper triangular component of QR decomposition |
-        | x    | ndarray[float64] | m    | solves Ax = b                                  |
+        | name | type             | size     | description                                    |
+        |------|------------------|----------|------------------------------------------------|
+        | Q    | ndarray[float64] | mxm      | orthogonal component of QR decomposition       |
+        | R    | ndarray[float64] | mxn      | upper triangular component of QR decomposition |
+        | P    | ndarray[int]     | n        | column permutation, A[:, P] = QR (pivoting)    |
+        | x    | ndarray[float64] | n or nxk | solves Ax = b                                  |
 
     Operation Modes:
 
         full: decomposes A (mxn) into the product QR, i.e. A = QR, where Q is a mxm orthogonal matrix and 
               R is a mxn upper triangular matrix
-        solve: find the least square solution x to Ax = b
+        economy: same as full, however Q is only m x min(m,n) and R is min(m,n) x n, no m x m matrix is allocated
+        solve: find the least square solution x to Ax = b, b may hold k right-hand sides as columns
+
+    With ``pivoting`` the columns are permuted such that the diagonal of R decreases in magnitude, and the
+    permutation P is returned as third output. In solve mode the minimum norm least squares solution is returned,
+    which is well defined even if A is (numerically) rank deficient, e.g. for fits with duplicate x nodes.
     """
     mode = kwargs.get('mode', 'full')
     debug = kwargs.get('debug', False)
-    R = A.astype(float64)
-    m,n = R.shape
+    pivoting = kwargs.get('pivoting', False)
+
+    F = PivotedQR(A, rcond=kwargs.get('rcond')) if pivoting else CompactQR(A)
 
-    if mode == 'full':
-        Q = eye(m)
+    if mode in ('full', 'economy'):
+        economy = mode == 'economy'
+        Q, R = F.Q(economy), F.R(economy)
+        if debug:
+            print(f'Q:\n{Q}')
+            print(f'R:\n{R}')
+        return (Q, R, F.perm) if pivoting else (Q, R)
     elif mode == 'solve':
-        c = b.astype(float64)
+        return F.solve(b)
+    raise ValueError(f'unknown mode {mode}, must be one of full, economy and solve')
 
 
-    for k in range(n):
-        ak = R[:,k][k:]
-        uk = concat((zeros(k, dtype=float64), ak + sign(R[k,k])* norm(ak) * e1(m-k)))
-        R = R - 2 / norm(uk)**2 * outer(uk, R.T @ uk)
+# ----------------------------------------------------------------------------------------------------------------------
+#                                                       CLASS
+# ----------------------------------------------------------------------------------------------------------------------
+class CompactQR:
+    """
+    Householder QR-decomposition, which stores Q implicitly by its householder vectors
 
-        if mode == 'full':
-            Q = Q @ householder(uk)
-            if debug:
-                print(f'Q:\n{Q}')
-                print(f'R:\n{R}')
-        if mode == 'solve':
-            c = c - 2 / norm(uk)**2 * (uk.T @ c) * uk
+    Every reflector H_k = I - tau_k v_k v_k^T is kept as the vector v_k (with v_k[k] = 1, zero above) and the
+    scalar tau_k. The reflectors are aggregated into blocks of ``block`` columns in the compact WY form
 
+        H_j H_(j+1) ... H_(j+b-1) = I - V T V^T
 
-    if mode == 'full':
-        return Q, R
-    elif mode == 'solve':
-        return backsubs(R, c)
+    with an upper triangular (b x b) matrix T, such that applying Q or Q^T consists of three matrix-matrix
+    products per block. Neither Q nor a single reflector is ever formed explicitly, the factorization takes
+    O(mn^2) operations and O(mn) memory, compared to O(m^3 n) operations and O(m^2) memory of ``householder``.
+
+    Attributes:
+    -----------
+    V : ndarray
+        (m x n) matrix, whose k-th column is the householder vector v_k
+    tau : ndarray
+        the n scaling factors of the reflectors
+    blocks : list
+        tuples (j, T) of the first column j of each block and its T factor
+    """
+
+    def __init__(self, A : ndarray, block : Optional[int] = 32) -> None:
+        R = array(A, dtype=float64)
+        m, n = R.shape
+        self.m, self.n = m, n
+        self.block = block
+        self.V = zeros((m, n), dtype=float64)
+        self.tau = zeros(n, dtype=float64)
+        self.blocks : List[Tuple[int, ndarray]] = []
+
+        for j in range(0, min(m, n), block):
+            b = min(j + block, m, n)
+            # unblocked factorization of the panel R[j:, j:b] with rank-1 updates
+            for k in range(j, b):
+                self.tau[k] = reflector(R[k:, k], self.V[k:, k])
+                if k + 1 < b:
+                    R[k:, k+1:b] -= self.tau[k] * outer(self.V[k:, k], self.V[k:, k] @ R[k:, k+1:b])
+            T = self.T_factor(j, b)
+            self.blocks.append((j, T))
+            # update of the trailing matrix with the aggregated block reflector
+            if b < n:
+                V = self.V[j:, j:b]
+                R[j:, b:] -= V @ (T.T @ (V.T @ R[j:, b:]))
+
+        self.upper = triu(R[:min(m, n)])
+
+    def T_factor(self, j : int, b : int) -> ndarray:
+        """
+        Compute the triangular factor T of the block of reflectors j,...,b-1
+        """
+        V = self.V[j:, j:b]
+        T = zeros((b - j, b - j), dtype=float64)
+        for i in range(b - j):
+            T[:i, i] = -self.tau[j+i] * (T[:i, :i] @ (V[:, :i].T @ V[:, i]))
+            T[i, i] = self.tau[j+i]
+        return T
+
+    def append(self, a : ndarray) -> None:
+        """
+        Append the column ``a`` to the factored matrix, i.e. update the factorization of A to one of [A, a]
+
+        The existing reflectors are applied to ``a`` and one new reflector annihilates its entries below the
+        diagonal, which costs O(mn) instead of O(mn^2) for factoring [A, a] from scratch. The new reflector is
+        added to the last block (extending its T factor by one column), or starts a new block if the last one
+        is full. The storage grows geometrically, so appending k columns costs O(mnk) overall.
+        """
+        a = self.apply_QT(a)
+        k = self.n
+
+        if k == self.V.shape[1]:
+            V = zeros((self.m, max(2 * k, 1)), dtype=float64)
+            tau = zeros(max(2 * k, 1), dtype=float64)
+            V[:, :k] = self.V
+            tau[:k] = self.tau
+            self.V, self.tau = V, tau
+
+        if k < self.m:
+            self.tau[k] = reflector(a[k:], self.V[k:, k])
+            if self.blocks and len(self.blocks[-1][1]) < self.block:
+                j, T = self.blocks[-1]
+                b = len(T)
+                T_new = zeros((b + 1, b + 1), dtype=float64)
+                T_new[:b, :b] = T
+                T_new[:b, b] = -self.tau[k] * (T @ (self.V[k:, j:k].T @ self.V[k:, k]))
+                T_new[b, b] = self.tau[k]
+                self.blocks[-1] = (j, T_new)
+            else:
+                self.blocks.append((k, array([[self.tau[k]]])))
+
+        rows = min(self.m, k + 1)
+        upper = zeros((rows, k + 1), dtype=float64)
+        upper[:len(self.upper), :k] = self.upper
+        upper[:, k] = a[:rows]
+        self.upper = upper
+        self.n += 1
+
+    def leading(self, k : int) -> CompactQR:
+        """
+        Return the factorization of the first ``k`` columns of A
+
+        Since the reflectors of the first k columns do not depend on the later ones, the result shares all of its
+        data with this instance (as views), no computation is necessary.
+        """
+        if not 0 < k <= self.n:
+            raise ValueError(f'invalid number of columns {k}, must be in 1,...,{self.n}')
+        F = CompactQR.__new__(CompactQR)
+        F.m, F.n, F.block = self.m, k, self.block
+        F.V = self.V[:, :k]
+        F.tau = self.tau[:k]
+        F.blocks = [(j, T[:k-j, :k-j]) for j, T in self.blocks if j < k]
+        F.upper = self.upper[:min(self.m, k), :k]
+        return F
+
+    def apply_QT(self, X : ndarray) -> ndarray:
+        """
+        Return Q^T X, where ``X`` is a vector of length m or a matrix with m rows
+        """
+        X = array(X, dtype=float64)
+        for j, T in self.blocks:
+            V = self.V[j:, j:j+len(T)]
+            X[j:] -= V @ (T.T @ (V.T @ X[j:]))
+        return X
+
+    def apply_Q(self, X : ndarray) -> ndarray:
+        """
+        Return Q X, where ``X`` is a vector of length m or a matrix with m rows
+        """
+        X = array(X, dtype=float64)
+        for j, T in reversed(self.blocks):
+            V = self.V[j:, j:j+len(T)]
+            X[j:] -= V @ (T @ (V.T @ X[j:]))
+        return X
+
+    def Q(self, economy : Optional[bool] = False) -> ndarray:
+        """
+        Form the orthogonal factor explicitly, either as full (m x m) or as economy (m x min(m,n)) matrix
+        """
+        k = min(self.m, self.n) if economy else self.m
+        return self.apply_Q(eye(self.m, k))
+
+    def R(self, economy : Optional[bool] = False) -> ndarray:
+        """
+        Return the upper triangular factor, either as full (m x n) or as economy (min(m,n) x n) matrix
+        """
+        if economy:
+            return self.upper.copy()
+        R = zeros((self.m, self.n), dtype=float64)
+        R[:len(self.upper)] = self.upper
+        return R
+
+    def solve(self, b : ndarray) -> ndarray:
+        """
+        Find the least squares solution x to Ax = b, or one column of x per column of b
+        """
+        return backsubs(self.upper[:, :self.n], self.apply_QT(b)[:self.n])
+
+
+class PivotedQR(CompactQR):
+    """
+    Householder QR-decomposition with column pivoting, A P = QR
+
+    In step k the remaining column of largest norm is swapped into position k (Businger-Golub), such that
+    |R[0,0]| >= |R[1,1]| >= ... and the numerical rank r is revealed by the first diagonal entry below
+    ``rcond`` * |R[0,0]| (default: max(m,n) machine epsilon). The column norms are downdated in O(n) per step
+    and only recomputed when cancellation has eaten half of their digits (as in LAPACK's xGEQP3).
+
+    Since every pivot depends on the fully updated trailing matrix, the reflectors are generated one at a time,
+    they are aggregated into blocks for applying Q afterwards. ``solve`` returns the minimum norm least squares
+    solution from the complete orthogonal decomposition, which costs an additional O(n r^2) instead of an SVD.
+
+    Attributes:
+    -----------
+    perm : ndarray
+        column permutation, A[:, perm] = QR
+    rank : int
+        numerical rank of A
+    rcond : float
+        the relative cutoff used for the rank
+    """
+
+    def __init__(self, A : ndarray, block : Optional[int] = 32, rcond : Optional[float] = None) -> None:
+        R = array(A, dtype=float64)
+        m, n = R.shape
+        self.m, self.n = m, n
+        self.block = block
+        self.V = zeros((m, n), dtype=float64)
+        self.tau = zeros(n, dtype=float64)
+        self.perm = arange(n)
+
+        norms = norm(R, axis=0)
+        reference = norms.copy()
+        for k in range(min(m, n)):
+            p = k + argmax(norms[k:])
+            if p != k:
+                R[:, [k, p]] = R[:, [p, k]]
+                for v in (norms, reference, self.perm):
+                    v[[k, p]] = v[[p, k]]
+            self.tau[k] = reflector(R[k:, k], self.V[k:, k])
+            if k + 1 < n:
+                R[k:, k+1:] -= self.tau[k] * outer(self.V[k:, k], self.V[k:, k] @ R[k:, k+1:])
+                # remove the entries of row k from the norms of the trailing columns
+                rest = norms[k+1:]
+                ratio = divide(abs(R[k, k+1:]), rest, out=zeros(n - k - 1), where=rest > 0.0)
+                rest *= sqrt(maximum(1.0 - ratio**2, 0.0))
+                stale = where(rest <= sqrt(finfo(float64).eps) * reference[k+1:])[0] + k + 1
+                norms[stale] = norm(R[k+1:, stale], axis=0)
+                reference[stale] = norms[stale]
+
+        self.blocks = [(j, self.T_factor(j, min(j + block, m, n))) for j in range(0, min(m, n), block)]
+        self.upper = triu(R[:min(m, n)])
+
+        d = abs(self.upper.diagonal())
+        self.rcond = max(m, n) * finfo(float64).eps if rcond is None else rcond
+        self.rank = int(sum(d > self.rcond * d[0])) if len(d) and d[0] > 0.0 else 0
+
+    def append(self, a : ndarray) -> None:
+        """
+        Append the column ``a`` without pivoting, it is placed behind all other columns and only counts towards
+        the rank, if A had full column rank before
+        """
+        super().append(a)
+        self.perm = concatenate((self.perm, [self.n - 1]))
+        k = self.n - 1
+        if self.rank == k and k < self.m and abs(self.upper[k, k]) > self.rcond * abs(self.upper[0, 0]):
+            self.rank += 1
+
+    def solve(self, b : ndarray) -> ndarray:
+        """
+        Find the minimum norm least squares solution x to Ax = b, or one column of x per column of b
+
+        With R11 the leading (r x r) block of R, the rows [R11 R12] are factored once more from the right,
+        [R11 R12]^T = Z L^T with L lower triangular, which gives A P = Q [L 0; 0 0] Z^T. The solution is then
+        x = P Z [L^-1 (Q^T b)_(1:r); 0], the trailing block R22 below the rank cutoff is treated as zero.
+        """
+        r = self.rank
+        x = zeros((self.n,) + b.shape[1:], dtype=float64)
+        if r == 0:
+            return x
+        if r == self.n:
+            x[self.perm] = backsubs(self.upper[:r, :r], self.apply_QT(b)[:r])
+            return x
+        Z = CompactQR(self.upper[:r].T)
+        y = zeros((self.n,) + b.shape[1:], dtype=float64)
+        y[:r] = forwsubs(Z.upper[:r, :r].T, self.apply_QT(b)[:r])
+        x[self.perm] = Z.apply_Q(y)
+        return x
+
+
+# ----------------------------------------------------------------------------------------------------------------------
+#                                                  HELPER FUNCTIONS
+# ----------------------------------------------------------------------------------------------------------------------
+def givens(a : float, b : float) -> Tuple[float, float, float]:
+    """
+    Compute the givens rotation G = [[c, s], [-s, c]] with G [a, b]^T = [r, 0]^T and return c, s and r
+    """
+    if b == 0.0:
+        return 1.0, 0.0, a
+    r = hypot(a, b)
+    return a / r, b / r, r
+
+def reflector(x : ndarray, v : ndarray) -> float:
+    """
+    Compute the householder reflector H = I - tau v v^T with Hx = beta e1 and return tau
+
+    The vector ``x`` is overwritten with beta e1 and the householder vector is written into ``v``, normalized
+    to v[0] = 1. The sign of beta is chosen opposite to x[0] to avoid cancellation. If x is already a multiple of
+    e1, H is the identity, i.e. tau = 0.
+    """
+    v[0] = 1.0
+    alpha = x[0]
+    sigma = norm(x[1:])
+    if sigma == 0.0:
+        v[1:] = 0.0
+        return 0.0
+    beta = -copysign(sqrt(alpha**2 + sigma**2), alpha)
+    v[1:] = x[1:] / (alpha - beta)
+    x[0] = beta
+    x[1:] = 0.0
+    return (beta - alpha) / beta
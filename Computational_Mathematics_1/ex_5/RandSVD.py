@@ -0,0 +1,122 @@
+"""
+author        : Moritz Mossböck | 11820925 | moritz.mossboeck@student.tugraz.at
+file          : RandSVD.py      | UTF-8
+target version: python 3.10.8   | 64-bit
+course        : Computational Mathematics 1
+"""
+
+# ----------------------------------------------------------------------------------------------------------------------
+#                                                   IMPORT SECTION
+# ----------------------------------------------------------------------------------------------------------------------
+from numpy import ndarray, float64, zeros, asarray, arange, column_stack as colstack
+from numpy.linalg import svd
+from numpy.random import Generator, default_rng
+from typing import Callable, Optional, Tuple, Union
+
+# project imports
+from QR import CompactQR
+
+MatMat = Callable[[ndarray], ndarray]
+
+
+# ----------------------------------------------------------------------------------------------------------------------
+#                                              FUNCTION DECLARATIONS
+# ----------------------------------------------------------------------------------------------------------------------
+def orth(Y : ndarray) -> ndarray:
+    """
+    Return an orthonormal basis of the columns of ``Y`` (the economy Q factor)
+    """
+    return CompactQR(Y).Q(economy=True)
+
+def from_matvec(matvec : Callable[[ndarray], ndarray]) -> MatMat:
+    """
+    Turn a function computing Ax for a single vector x into one computing AX column by column
+    """
+    return lambda X: colstack([matvec(X[:, j]) for j in range(X.shape[1])])
+
+def operators(A : ndarray, block_rows : int) -> Tuple[MatMat, MatMat]:
+    """
+    Return the functions X -> AX and Y -> A^T Y for an array, which read ``block_rows`` rows of A at a time
+
+    For memmapped arrays this bounds the memory to one block of A, in-memory arrays are simply processed in
+    slices of the same size.
+    """
+    m = A.shape[0]
+
+    def matmat(X : ndarray) -> ndarray:
+        Y = zeros((m, X.shape[1]), dtype=float64)
+        for i in range(0, m, block_rows):
+            Y[i:i+block_rows] = asarray(A[i:i+block_rows], dtype=float64) @ X
+        return Y
+
+    def rmatmat(Y : ndarray) -> ndarray:
+        Z = zeros((A.shape[1], Y.shape[1]), dtype=float64)
+        for i in range(0, m, block_rows):
+            Z += asarray(A[i:i+block_rows], dtype=float64).T @ Y[i:i+block_rows]
+        return Z
+
+    return matmat, rmatmat
+
+def RandSVD(A : Union[ndarray, MatMat], k : int, rmatmat : Optional[MatMat] = None,
+            shape : Optional[Tuple[int, int]] = None, oversample : Optional[int] = 10, power : Optional[int] = 2,
+            rng : Optional[Generator] = None, block_rows : Optional[int] = 100_000) -> Tuple[ndarray, ndarray, ndarray]:
+    """
+    Compute an approximation of the k largest singular values and vectors of A with a randomized range finder
+
+    Inputs:
+        | name       | type               | size | optional | description                                     |
+        |------------|--------------------|------|----------|-------------------------------------------------|
+        | A          | ndarray or func    | mxn  | false    | matrix, memmap or function X -> AX              |
+        | k          | int                |      | false    | number of singular triplets                     |
+        | rmatmat    | func               |      | true     | function Y -> A^T Y, required if A is a func    |
+        | shape      | tuple              |      | true     | (m, n), required if A is a func                 |
+        | oversample | int                |      | true     | additional sample vectors, improves accuracy    |
+        | power      | int                |      | true     | number of power iterations                      |
+        | rng        | Generator          |      | true     | random number generator of the sketch           |
+        | block_rows | int                |      | true     | rows of A read at once, if A is an array        |
+
+    Outputs:
+        | name | type             | size | description                                 |
+        |------|------------------|------|---------------------------------------------|
+        | U    | ndarray[float64] | mxk  | approximate left singular vectors           |
+        | S    | ndarray[float64] | k    | approximate singular values (descending)    |
+        | Vt   | ndarray[float64] | kxn  | approximate right singular vectors as rows  |
+
+    The range of A is sampled with l = k + ``oversample`` gaussian vectors, Y = A Omega, and orthonormalized with
+    ``CompactQR``, Y = QR. Then A ~ Q Q^T A = Q B, and the SVD of the small (l x n) matrix B = (A^T Q)^T is
+    computed densely. Each of the ``power`` iterations replaces Y by A A^T Y (orthonormalizing in between to
+    keep the columns from collapsing onto the dominant direction), which sharpens the approximation if the
+    singular values decay slowly. Overall A is touched 2 (power + 1) times and the cost is O(mnl) instead of
+    O(mn^2) for a full decomposition.
+
+    Functions for matrices, which are only available implicitly, have to accept and return 2D arrays with l
+    columns, a function for single vectors can be adapted with ``from_matvec``.
+    """
+    if callable(A):
+        if rmatmat is None or shape is None:
+            raise ValueError('rmatmat and shape are required, if A is given as a function')
+        matmat = A
+        m, n = shape
+    else:
+        m, n = A.shape
+        matmat, rmatmat = operators(A, block_rows)
+
+    l = min(k + oversample, m, n)
+    if not 0 < k <= l:
+        raise ValueError(f'invalid rank {k}, must be in 1,...,{min(m, n)}')
+    rng = rng or default_rng()
+
+    Q = orth(matmat(rng.standard_normal((n, l))))
+    for _ in range(power):
+        Q = orth(matmat(orth(rmatmat(Q))))
+
+    U, S, Vt = svd(rmatmat(Q).T, full_matrices=False)
+    return Q @ U[:, :k], S[:k], Vt[:k]
+
+
+if __name__ == '__main__':
+    rng = default_rng(42)
+    A = rng.standard_normal((2000, 50)) * 0.8**arange(50) @ rng.standard_normal((50, 500))
+    U, S, Vt = RandSVD(A, 10, rng=rng)
+    print(f'randomized: {S}')
+    print(f'exact     : {svd(A, compute_uv=False)[:10]}')
@@ -0,0 +1,179 @@
+"""
+author        : Moritz Mossböck | 11820925 | moritz.mossboeck@student.tugraz.at
+file          : RollingFitter.py | UTF-8
+target version: Python 3.10.8   | 64-bit
+course        : Computational Mathematics 1
+"""
+
+# ----------------------------------------------------------------------------------------------------------------------
+#                                                   IMPORT SECTION
+# ----------------------------------------------------------------------------------------------------------------------
+from __future__ import annotations
+from numpy import zeros, float64, ndarray, sqrt, array, arange, cumprod, column_stack as colstack, ones, dot
+from math import comb
+from typing import Optional, Tuple
+
+# project imports
+from QR import CompactQR, givens
+from common import backsubs, forwsubs
+
+# ----------------------------------------------------------------------------------------------------------------------
+#                                                       CLASS
+# ----------------------------------------------------------------------------------------------------------------------
+
+
+class RollingFitter:
+    """
+    Least squares polynomials of degree m over all sliding windows of w consecutive samples
+
+    Instead of factoring the (w x m+1) vandermonde matrix of every window anew, the R factor of the augmented
+    matrix [V, y] is carried from one window to the next: the newest row is rotated in with givens rotations
+    (update) and the oldest row is removed with the LINPACK downdating algorithm. Both take O(m^2) operations,
+    thus all windows of a signal of length N cost O(N m^2) instead of O(N w m^2). The last column of R holds
+    Q^T y, so the coefficients follow by back-substitution, and its last diagonal entry is the residual norm.
+
+    The powers are taken of u = (x - a) / h, where h is half the width of the first window and the anchor a is
+    the center of the window at the last refresh. Every ``refresh`` steps (and whenever a downdate fails
+    numerically) R is recomputed from scratch with the anchor moved to the current window, which bounds both
+    the growth of u and the accumulation of rounding errors of repeated downdating. The default refresh of w
+    steps amortizes to O(m^2) per window, values much larger than w let u grow and lose accuracy.
+    """
+
+    def __init__(self, w: int, m: Optional[int] = 2, refresh: Optional[int] = None) -> None:
+        if w < m + 1:
+            raise ValueError(f'window of {w} samples is too short for a fit of degree {m}')
+        self.w = w
+        self.m = m + 1
+        self.refresh = refresh or w
+        self.centers = zeros(0, dtype=float64)
+
+    # fitting
+    def fit(self, x_data: ndarray, y_data: ndarray) -> Tuple[ndarray, ndarray]:
+        """
+        Fit all windows of the samples (x_data, y_data) and return their coefficients and fitted values
+
+        Returns:
+        --------
+        coefficients : ndarray
+            (N-w+1 x m+1) array, row s holds the ascending coefficients of the fit over x[s:s+w] as a polynomial
+            in (x - c_s), where c_s = (x[s] + x[s+w-1]) / 2 is the center of the window (see ``centers``)
+        values : ndarray
+            the fit of each window evaluated at its middle sample x[s + w//2]
+        """
+        x = array(x_data).astype(float64)
+        y = array(y_data).astype(float64)
+        if len(x) != len(y):
+            raise ValueError(f'x_data and y_data must be of same length, got {len(x)} != {len(y)}')
+        if len(x) < self.w:
+            raise ValueError(f'need at least {self.w} samples, got {len(x)}')
+
+        N = len(x) - self.w + 1
+        w = self.w
+        h = (x[w-1] - x[0]) / 2 or 1.0
+        u_coeffs = zeros((N, self.m), dtype=float64)
+        anchors = zeros(N, dtype=float64)
+
+        R = None
+        for s in range(N):
+            if s % self.refresh == 0:
+                R = None
+            else:
+                self.update(R, self.row(x[s+w-1], y[s+w-1], anchor, h))
+                if not self.downdate(R, self.row(x[s-1], y[s-1], anchor, h)):
+                    R = None
+            if R is None:
+                anchor = (x[s] + x[s+w-1]) / 2
+                R = self.factor(x[s:s+w], y[s:s+w], anchor, h)
+            u_coeffs[s] = backsubs(R[:self.m, :self.m], R[:self.m, self.m])
+            anchors[s] = anchor
+
+        # shift from the anchored variable u to x - c_s and undo the scaling by h
+        self.centers = (x[:N] + x[w-1:]) / 2
+        coefficients = taylor_shift(u_coeffs, (self.centers - anchors) / h) / h**arange(self.m)
+        t = x[w//2:w//2+N] - self.centers
+        values = coefficients[:, -1].copy()
+        for k in reversed(range(self.m - 1)):
+            values = values * t + coefficients[:, k]
+        return coefficients, values
+
+    # rank-1 modifications of R
+    def row(self, x: float, y: float, anchor: float, h: float) -> ndarray:
+        """
+        Return the row [1, u, ..., u^m, y] of the augmented matrix for the sample (x,y)
+        """
+        r = ones(self.m + 1, dtype=float64)
+        r[1:self.m] = cumprod(((x - anchor) / h) * ones(self.m - 1))
+        r[self.m] = y
+        return r
+
+    def factor(self, x: ndarray, y: ndarray, anchor: float, h: float) -> ndarray:
+        """
+        Compute the (m+2 x m+2) R factor of the augmented matrix of a whole window from scratch
+        """
+        u = (x - anchor) / h
+        A = colstack((cumprod(colstack((ones(len(u)), u[:, None].repeat(self.m - 1, axis=1))), axis=1), y))
+        R = zeros((self.m + 1, self.m + 1), dtype=float64)
+        upper = CompactQR(A).R(economy=True)
+        R[:len(upper)] = upper
+        return R
+
+    @staticmethod
+    def update(R: ndarray, r: ndarray) -> None:
+        """
+        Replace R in-place by the R factor of the matrix with the additional row ``r``
+        """
+        r = r.copy()
+        for j in range(len(r)):
+            c, s, R[j, j] = givens(R[j, j], r[j])
+            Rj = R[j, j+1:].copy()
+            R[j, j+1:] = c * Rj + s * r[j+1:]
+            r[j+1:] = c * r[j+1:] - s * Rj
+
+    @staticmethod
+    def downdate(R: ndarray, r: ndarray) -> bool:
+        """
+        Replace R in-place by the R factor of the matrix without the row ``r`` (LINPACK dchdd)
+
+        Solves R^T a = r, then the rotations which annihilate a against alpha = sqrt(1 - |a|^2) from the bottom
+        up, applied to R, remove r. If |a| >= 1 up to rounding, the downdated matrix is numerically rank
+        deficient, R is left untouched and False is returned.
+        """
+        if (R.diagonal() == 0.0).any():
+            return False
+        a = forwsubs(R.T, r)
+        alpha2 = 1.0 - dot(a, a)
+        if alpha2 <= 1e-12:
+            return False
+        alpha = sqrt(alpha2)
+
+        p = len(r)
+        cs = zeros(p, dtype=float64)
+        sn = zeros(p, dtype=float64)
+        for i in reversed(range(p)):
+            cs[i], sn[i], alpha = givens(alpha, a[i])
+
+        xx = zeros(p, dtype=float64)
+        for i in reversed(range(p)):
+            t = cs[i] * xx[i:] + sn[i] * R[i, i:]
+            R[i, i:] = cs[i] * R[i, i:] - sn[i] * xx[i:]
+            xx[i:] = t
+        return True
+
+
+# ----------------------------------------------------------------------------------------------------------------------
+#                                                  HELPER FUNCTIONS
+# ----------------------------------------------------------------------------------------------------------------------
+
+def taylor_shift(c: ndarray, d: ndarray) -> ndarray:
+    """
+    Rewrite polynomials in u as polynomials in v = u - d, row-wise for a (k x m) array of coefficients
+
+    sum_j c_j (v + d)^j = sum_k b_k v^k with b_k = sum_{j >= k} binom(j, k) d^(j-k) c_j
+    """
+    k, m = c.shape
+    D = cumprod(colstack((ones(k), d[:, None].repeat(m - 1, axis=1))), axis=1)  # D[:, e] = d^e
+    b = zeros((k, m), dtype=float64)
+    for i in range(m):
+        for j in range(i, m):
+            b[:, i] += comb(j, i) * D[:, j - i] * c[:, j]
+    return b
@@ -0,0 +1,110 @@
+"""
+author        : Moritz Mossböck   | 11820925 | moritz.mossboeck@student.tugraz.at
+file          : StreamingFitter.py | UTF-8
+target version: Python 3.10.8     | 64-bit
+course        : Computational Mathematics 1
+"""
+
+# ----------------------------------------------------------------------------------------------------------------------
+#                                                   IMPORT SECTION
+# ----------------------------------------------------------------------------------------------------------------------
+from __future__ import annotations
+from numpy import zeros, float64, ndarray, sqrt, atleast_1d, ones, cumprod, column_stack as colstack, dot
+from typing import Optional
+
+# project imports
+from QR import CompactQR
+from Fitter import hankel
+from Polynomial import Polynomial
+
+# ----------------------------------------------------------------------------------------------------------------------
+#                                                       CLASS
+# ----------------------------------------------------------------------------------------------------------------------
+
+
+class StreamingFitter:
+    """
+    Polynomial least squares fit over a stream of samples, with constant memory
+
+    The normal equations of a fit of degree m only depend on the 2m+1 power sums s_k = sum(u^k) and the m+1
+    moments t_i = sum(u^i y), where u = (x - center) / scale. These sums are updated in O(m) per sample when
+    samples are added (``update``) or removed (``remove``, e.g. for sliding windows), and ``PolyFit`` solves
+    the (m+1 x m+1) hankel system in O(m^3), independent of the number of samples seen so far.
+
+    Choosing ``center`` and ``scale`` such that u stays roughly in [-1,1] keeps the power sums (and thus the
+    condition of the normal matrix) in check. Note that removing samples subtracts from the sums, thus
+    rounding errors accumulate on very long sliding windows, ``reset`` and re-adding the window fixes that.
+    """
+
+    def __init__(self, m: Optional[int] = 5, center: Optional[float] = 0.0, scale: Optional[float] = 1.0) -> None:
+        self.m = m + 1
+        self.center = center
+        self.scale = scale
+        self.f = Polynomial([0.0])
+        self.reset()
+
+    # special methods
+    def __call__(self, x: float | ndarray) -> float | ndarray:
+        return self.f((x - self.center) / self.scale)
+
+    def __str__(self) -> str:
+        return str(self.f)
+
+    def __len__(self) -> int:
+        return self.n
+
+    # streaming
+    def reset(self) -> None:
+        """
+        Forget all samples seen so far
+        """
+        self.n = 0
+        self.s = zeros(2 * self.m - 1, dtype=float64)
+        self.t = zeros(self.m, dtype=float64)
+        self.yy = 0.0
+
+    def update(self, x: float | ndarray, y: float | ndarray, sign: Optional[float] = 1.0) -> None:
+        """
+        Add a single sample or a chunk of samples to the sums
+
+        The powers of a chunk are computed vectorized as a (chunk x 2m-1) cumulative product, thus a chunk costs
+        O(chunk * m) operations and memory.
+        """
+        u = (atleast_1d(x).astype(float64) - self.center) / self.scale
+        y = atleast_1d(y).astype(float64)
+        if len(u) != len(y):
+            raise ValueError(f'x and y must be of same length, got {len(u)} != {len(y)}')
+
+        powers = cumprod(colstack((ones(len(u)), u[:, None].repeat(2 * self.m - 2, axis=1))), axis=1)
+        self.s += sign * powers.sum(axis=0)
+        self.t += sign * (y @ powers[:, :self.m])
+        self.yy += sign * dot(y, y)
+        self.n += int(sign) * len(u)
+
+    def remove(self, x: float | ndarray, y: float | ndarray) -> None:
+        """
+        Remove a single sample or a chunk of samples, which have previously been added, from the sums
+        """
+        self.update(x, y, -1.0)
+
+    # fitting
+    def PolyFit(self) -> ndarray:
+        """
+        Fit a polynomial of degree m to all current samples, the coefficients refer to the variable u
+        """
+        if self.n < self.m:
+            raise ValueError(f'not enough samples for a fit of degree {self.m - 1}, need {self.m} > {self.n}')
+        c = CompactQR(hankel(self.s, self.m)).solve(self.t)
+        self.f = Polynomial(c)
+        return c
+
+    def StdDev(self) -> float:
+        """
+        Compute the standard deviation of the current fitted function to all current samples
+
+        The residual sum of squares is |y|^2 - 2 c^T t + c^T A c, which only requires the stored sums.
+        """
+        c = zeros(self.m, dtype=float64)
+        c[:len(self.f.coefficients)] = self.f.coefficients
+        S = self.yy - 2 * dot(c, self.t) + c @ hankel(self.s, self.m) @ c
+        return sqrt(max(S, 0.0) / (self.n - self.m + 1))
@@ -0,0 +1,133 @@
+"""
+author        : Moritz Mossböck | 11820925 | moritz.mossboeck@student.tugraz.at
+file          : TSQR.py         | UTF-8
+target version: python 3.10.8   | 64-bit
+course        : Computational Mathematics 1
+"""
+
+# ----------------------------------------------------------------------------------------------------------------------
+#                                                   IMPORT SECTION
+# ----------------------------------------------------------------------------------------------------------------------
+from concurrent.futures import ProcessPoolExecutor, Future
+from itertools import chain
+from os import cpu_count
+from numpy import ndarray, float64, vstack, column_stack as colstack, asarray, zeros
+from numpy.linalg import norm
+from typing import Iterable, Iterator, Optional, Tuple, List, Union
+
+# project imports
+from QR import CompactQR
+from common import backsubs
+
+
+# ----------------------------------------------------------------------------------------------------------------------
+#                                              FUNCTION DECLARATIONS
+# ----------------------------------------------------------------------------------------------------------------------
+def block_R(block : ndarray) -> ndarray:
+    """
+    Return the (economy) R factor of a single row block, this is the task executed by the worker processes
+    """
+    return CompactQR(asarray(block, dtype=float64)).R(economy=True)
+
+def row_blocks(A : ndarray, block_rows : int) -> Iterator[ndarray]:
+    """
+    Split ``A`` into blocks of ``block_rows`` rows, for memmapped arrays only one block is read at a time
+    """
+    for i in range(0, A.shape[0], block_rows):
+        yield A[i:i+block_rows]
+
+def TSQR(A : Union[ndarray, Iterable[ndarray]], block_rows : Optional[int] = 100_000,
+         workers : Optional[int] = None) -> ndarray:
+    """
+    Compute the R factor of a tall-skinny matrix with the communication-avoiding TSQR algorithm
+
+    Inputs:
+        | name       | type                       | size | optional | description                          |
+        |------------|----------------------------|------|----------|--------------------------------------|
+        | A          | ndarray or iterable        | mxn  | false    | matrix, memmap or row blocks of A    |
+        | block_rows | int                        |      | true     | rows per block, if A is an array     |
+        | workers    | int                        |      | true     | number of processes (default: cpus)  |
+
+    Outputs:
+        | name | type             | size | description                                    |
+        |------|------------------|------|------------------------------------------------|
+        | R    | ndarray[float64] | nxn  | upper triangular component of QR decomposition |
+
+    The rows of A are split into blocks A_1,...,A_p, each of which is factored A_i = Q_i R_i in a process pool.
+    Since [R_1; R_2] = Q' R' implies [A_1; A_2] = diag(Q_1, Q_2) Q' R', the small R factors are then stacked
+    pairwise and factored again up a binary tree, until a single R remains. Only the n x n factors travel
+    between the processes, and Q is never formed.
+
+    If ``A`` is not an array, it is consumed as an iterable of row blocks (e.g. a generator reading a file),
+    at most 2 * workers blocks are in flight at once. Together with the incremental reduction, which keeps at
+    most one R factor per tree level, the memory stays bounded independent of m, such that matrices larger
+    than the RAM can be factored. The R factor is unique up to the signs of its rows.
+    """
+    if isinstance(A, ndarray):
+        A = row_blocks(A, block_rows)
+    workers = workers or cpu_count()
+
+    levels : List[Optional[ndarray]] = []  # levels[l] is the pending R factor of 2^l blocks (binary counter)
+
+    def reduce(R : ndarray) -> None:
+        l = 0
+        while l < len(levels) and levels[l] is not None:
+            R = block_R(vstack((levels[l], R)))
+            levels[l] = None
+            l += 1
+        if l == len(levels):
+            levels.append(R)
+        else:
+            levels[l] = R
+
+    with ProcessPoolExecutor(workers) as pool:
+        pending : List[Future] = []
+        for block in A:
+            pending.append(pool.submit(block_R, block))
+            if len(pending) >= 2 * workers:
+                reduce(pending.pop(0).result())
+        for future in pending:
+            reduce(future.result())
+
+    remaining = [R for R in levels if R is not None]
+    if not remaining:
+        raise ValueError('passed matrix has no rows')
+    R = remaining[0]
+    for S in remaining[1:]:
+        R = block_R(vstack((S, R)))
+    return R
+
+def TSQRSolve(A : Union[ndarray, Iterable[Tuple[ndarray, ndarray]]], b : Optional[ndarray] = None,
+              block_rows : Optional[int] = 100_000, workers : Optional[int] = None) -> Tuple[ndarray, ndarray]:
+    """
+    Find the least squares solution x to Ax = b with ``TSQR``, and return it together with the residual norm
+
+    ``A`` and ``b`` may be arrays (or memmaps), ``b`` with one or k columns. Alternatively ``A`` is an iterable
+    of row blocks (A_i, b_i) and ``b`` is None. Instead of applying Q^T to b, the augmented matrix [A, b] is
+    factored, its R factor is
+
+        | R  z |
+        | 0  r |
+
+    with z = Q^T b, so that x solves Rx = z and the column norms of r are the norms of the residuals Ax - b.
+    """
+    if b is not None:
+        k = 1 if b.ndim == 1 else b.shape[1]
+        blocks = (colstack((A[i:i+block_rows], b[i:i+block_rows])) for i in range(0, A.shape[0], block_rows))
+    else:
+        pairs = iter(A)
+        first = next(pairs)
+        k = 1 if first[1].ndim == 1 else first[1].shape[1]
+        blocks = (colstack(pair) for pair in chain([first], pairs))
+
+    S = TSQR(blocks, block_rows, workers)
+    n = S.shape[1] - k
+    if S.shape[0] < n:
+        raise ValueError(f'underdetermined system, need at least {n} rows')
+
+    R, z = S[:n, :n], S[:n, n:]
+    x = colstack([backsubs(R, z[:, j]) for j in range(k)])
+    residual = norm(S[n:, n:], axis=0) if S.shape[0] > n else zeros(k)
+    if k == 1:
+        return x[:, 0], residual[0]
+    return x, residual
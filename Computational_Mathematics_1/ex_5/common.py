@@ -1,11 +1,11 @@
-from numpy import ndarray, zeros, dot
+from numpy import ndarray, zeros, dot, array, arange, where, minimum, sqrt, float64
 
 def backsubs(U : ndarray, b : ndarray) -> ndarray:
     """
     Apply back-substition for solving a linear equation with upper triangular matrix
     """
     m,n = U.shape
-    x = zeros(n)
+    x = zeros((n,) + b.shape[1:])  # b may hold several right-hand sides as columns
     for j in reversed(range(n)):
         x[j] = (b[j] - dot(U[j,:][j:],x[j:])) / U[j,j]
     return x
@@ -15,7 +15,46 @@ def forwsubs(L : ndarray, b : ndarray) -> ndarray:
     Apply forward-substitution for solving a linear equation with lower triangular matrix
     """
     m, n = L.shape
-    x = zeros(n)
+    x = zeros((n,) + b.shape[1:])
     for j in range(n):
         x[j] = (b[j] - dot(L[j,:][:j],x[:j])) / L[j,j]
-    return x
\ No newline at end of file
+    return x
+
+def cholesky_banded(ab : ndarray) -> ndarray:
+    """
+    Compute the cholesky factor L (A = LL^T) of a symmetric positive definite band matrix in O(np^2)
+
+    Both A and L are stored by their lower diagonals, ab[d, j] = A[j+d, j] for d = 0,...,p (as in LAPACK's
+    xPBTRF with uplo='L'), entries beyond the end of the matrix are ignored.
+    """
+    p = ab.shape[0] - 1
+    n = ab.shape[1]
+    L = array(ab, dtype=float64)
+    for j in range(n):
+        # subtract the contributions of the previous p columns, L[i,k] = L[i-k, k]
+        k = arange(max(0, j - p), j)
+        i = arange(j, min(j + p + 1, n))
+        d = i[:, None] - k[None, :]
+        inside = d <= p
+        Lik = where(inside, L[minimum(d, p), k], 0.0)
+        L[i - j, j] -= Lik @ L[j - k, k]
+        if L[0, j] <= 0.0:
+            raise ValueError(f'matrix is not positive definite (pivot {j})')
+        L[0, j] = sqrt(L[0, j])
+        L[1:len(i), j] /= L[0, j]
+    return L
+
+def solve_banded_cholesky(L : ndarray, b : ndarray) -> ndarray:
+    """
+    Solve Ax = b with the banded cholesky factor L of A (see ``cholesky_banded``), b may hold several columns
+    """
+    p = L.shape[0] - 1
+    n = L.shape[1]
+    y = array(b, dtype=float64)
+    for j in range(n):
+        k = arange(max(0, j - p), j)
+        y[j] = (y[j] - L[j - k, k] @ y[k]) / L[0, j]
+    for j in reversed(range(n)):
+        r = min(p, n - 1 - j)
+        y[j] = (y[j] - L[1:r+1, j] @ y[j+1:j+r+1]) / L[0, j]
+    return y
@@ -29,6 +29,8 @@ def GaussElim(A: ndarray, b: ndarray) -> ndarray:
     Since each column is eliminated indivdually, this function may produce a zero-column in any iteration, thus
     showing that A is singular and Ax = b  having no (unique) solution. If this occurs, the iteration is aborted and 
     a ValueError is raised.
+
+    If ``b`` is a matrix, all of its columns are eliminated along and the solutions are returned as columns.
     """
 
     m,n = A.shape
@@ -64,4 +66,4 @@ def GaussElim(A: ndarray, b: ndarray) -> ndarray:
                 continue
             else:
                 Ab[j,:] = Ab[j,:] - Ab[j,i] * Ab[i,:]
-    return Ab[:,n]
+    return Ab[:,n] if b.ndim == 1 else Ab[:,n:]
@@ -6,8 +6,11 @@ course        : Computational Mathematics 1 | MAT.208UB
 """
 
 # imports
-from numpy import ndarray, delete, subtract, divide, prod, sum, min, max, linspace, abs
-from typing import Optional, List
+from __future__ import annotations
+from numpy import ndarray, delete, subtract, divide, prod, sum, min, max, linspace, abs, array, asarray, float64, \
+    ones, zeros, cos, sin, pi, arange, flip, append, any, errstate, log, exp, sign, empty, shares_memory, argmax
+from math import comb
+from typing import Optional, List, Iterable, Iterator
 from matplotlib.axes import Axes
 from matplotlib.lines import Line2D
 
@@ -24,6 +27,8 @@ class LagrangeBasis:
         x-axis where the interpolant for given y-samples is evaluated on
     basis : list
         list of the numerical values of the lagrange basis polynomials
+    bary : BarycentricLagrange
+        barycentric form of the interpolation, created on the first call of `evaluate` or `chunks`
 
     Methods:
     --------
@@ -32,6 +37,10 @@ class LagrangeBasis:
     interpolate(y_data : ndarray) -> ndarray
         interpolate the function whose samples at the passed x-nodes (self.x_data) are stored in 
         y_data and return the interpolation polynomial (evaluated over x)
+    evaluate(y_data : ndarray, x : ndarray, chunk_size : int, out : ndarray) -> ndarray
+        evaluate the interpolation polynomial at arbitrary points in chunks of bounded memory
+    chunks(y_data : ndarray, x_chunks : Iterable[ndarray]) -> Iterator[ndarray]
+        evaluate the interpolation polynomial lazily on a stream of point arrays
 
     Constructor:
     ------------
@@ -73,6 +82,7 @@ class LagrangeBasis:
             self.n = n
 
         self.basis = [None] * self.n
+        self.bary = None
 
     def ljn(self, j: int) -> ndarray:
         """
@@ -126,6 +136,261 @@ class LagrangeBasis:
             raise ValueError(f'missing samples, at least {self.n} required')
         return sum([y_data[j] * self.ljn(j) for j in range(self.n)], 0)
 
+    def evaluate(self, y_data: ndarray, x: ndarray, chunk_size: Optional[int] = 2**16,
+                 out: Optional[ndarray] = None) -> ndarray:
+        """
+        Evaluate the interpolant at arbitrary points x in chunks, optionally writing into ``out`` (e.g. a memmap)
+
+        In contrast to `interpolate`, no basis polynomial is materialized, the barycentric form of the first
+        `instance.n` nodes is used instead (see ``BarycentricLagrange.evaluate``).
+        """
+        return self.barycentric().evaluate(y_data, x, chunk_size, out)
+
+    def chunks(self, y_data: ndarray, x_chunks: Iterable[ndarray]) -> Iterator[ndarray]:
+        """
+        Lazily evaluate the interpolant on a stream of point arrays, yielding one result per chunk
+        """
+        return self.barycentric().chunks(y_data, x_chunks)
+
+    def barycentric(self) -> BarycentricLagrange:
+        """
+        Return the barycentric form of the interpolation on the first `instance.n` nodes, computed once
+        """
+        if self.bary is None:
+            self.bary = BarycentricLagrange(self.x_data[:self.n])
+        return self.bary
+
+
+class BarycentricLagrange:
+    """
+    Lagrange interpolation in the second (true) barycentric form
+
+        p(x) = sum_j w_j y_j / (x - x_j)  /  sum_j w_j / (x - x_j),    w_j = 1 / prod_(k != j) (x_j - x_k)
+
+    The weights only depend on the nodes, they are computed once in O(n^2), or in closed form for chebyshev and
+    equispaced nodes (see ``chebyshev`` and ``equispaced``). Afterwards every evaluation point costs O(n) and no
+    basis polynomial is ever stored. Multiplying all weights by a common factor does not change p, hence the
+    weights are kept normalized to a maximal magnitude of 1, which prevents over- and underflow for many nodes.
+
+    Attributes:
+    -----------
+    x_data : ndarray
+        the interpolation nodes (pairwise distinct, in any order)
+    w : ndarray
+        the (normalized) barycentric weights of the nodes
+    n : int
+        number of nodes
+    log_scale, sign : float
+        logarithm and sign of the common factor s, by which the stored weights differ from the true ones
+
+    Methods:
+    --------
+    add_node(x : float) -> None
+        add a node and update the weights in O(n)
+    interpolate(y_data : ndarray, x : ndarray) -> ndarray
+        evaluate the interpolant of the samples y_data at the points x
+
+    Constructor:
+    ------------
+        Parameters:
+        -----------
+        x_data : ndarray
+            x-coordinates of the samples
+        weights : ndarray, optional
+            known barycentric weights of the nodes, computed in O(n^2) if omitted
+
+        Raises:
+        -------
+        ValueError
+            if the nodes are not pairwise distinct
+    """
+
+    def __init__(self, x_data: ndarray, weights: Optional[ndarray] = None) -> None:
+        x_data = array(x_data, dtype=float64)
+        if weights is not None:
+            self.x_data = x_data
+            self.w = array(weights, dtype=float64)
+            self.n = len(x_data)
+            # recover the common factor s = w / w_true in O(n), needed by add_node, from the weight of largest
+            # magnitude, since small weights may have underflowed to zero
+            j = argmax(abs(self.w))
+            d = delete(x_data[j] - x_data, j)
+            self.log_scale = log(abs(self.w[j])) + sum(log(abs(d)))
+            self.sign = sign(self.w[j]) * prod(sign(d))
+            return
+
+        # one O(n) product per node in the logarithmic domain, thus O(n^2) time but only O(n) memory
+        self.x_data = x_data
+        self.n = len(x_data)
+        log_w = zeros(self.n, dtype=float64)
+        signs = ones(self.n, dtype=float64)
+        for j in range(self.n):
+            d = delete(x_data[j] - x_data, j)
+            if any(d == 0.0):
+                raise ValueError(f'node {x_data[j]} appears more than once')
+            log_w[j] = -sum(log(abs(d)))
+            signs[j] = prod(sign(d))
+        self.log_scale = -max(log_w)
+        self.sign = 1.0
+        self.w = signs * exp(log_w + self.log_scale)
+
+    @classmethod
+    def chebyshev(cls, n: int, a: Optional[float] = -1.0, b: Optional[float] = 1.0,
+                  kind: Optional[int] = 2) -> BarycentricLagrange:
+        """
+        Return the interpolator on the n+1 chebyshev points of the first or second kind in [a, b], in ascending order
+
+        The weights are known in closed form: w_j = (-1)^j sin((2j+1) pi / (2n+2)) for the first kind and
+        w_j = (-1)^j (halved for j = 0 and j = n) for the second kind.
+        """
+        j = arange(n + 1)
+        if kind == 1:
+            t = (2 * j + 1) * pi / (2 * n + 2)
+            w = (-1.0)**j * sin(t)
+        elif kind == 2:
+            t = j * pi / max([n, 1])
+            w = (-1.0)**j
+            w[[0, -1]] *= 0.5
+        else:
+            raise ValueError(f'invalid kind {kind}, must be 1 or 2')
+        x = (a + b) / 2 + (b - a) / 2 * cos(t)
+        return cls(flip(x), flip(w))
+
+    @classmethod
+    def equispaced(cls, n: int, a: float, b: float) -> BarycentricLagrange:
+        """
+        Return the interpolator on the n+1 equispaced points in [a, b] with the weights w_j = (-1)^j binom(n, j)
+        """
+        scale = comb(n, n // 2)
+        w = array([(-1)**j * comb(n, j) / scale for j in range(n + 1)], dtype=float64)
+        return cls(linspace(a, b, n + 1), w)
+
+    def add_node(self, x: float) -> None:
+        """
+        Add the node ``x``, every existing weight gets the additional factor 1 / (x_j - x) in O(n)
+
+        The stored weights are s w_j, where the common factor s is tracked by its logarithm and sign, such that
+        the weight of the new node s / prod(x - x_j) can be computed on the same scale without overflow.
+        """
+        d = self.x_data - x
+        if any(d == 0.0):
+            raise ValueError(f'node {x} is already contained in the nodes')
+        w_new = self.sign * prod(sign(-d)) * exp(self.log_scale - sum(log(abs(d))))
+        w = append(self.w / d, w_new)
+        scale = abs(w).max()
+        self.w = w / scale
+        self.log_scale -= log(scale)
+        self.x_data = append(self.x_data, x)
+        self.n += 1
+
+    def interpolate(self, y_data: ndarray, x: ndarray, chunk_size: Optional[int] = 2**16) -> ndarray:
+        """
+        Evaluate the interpolant of the passed samples at the points x
+
+        The samples may also be a (n x k) matrix, then the k interpolants are evaluated at once. At points which
+        coincide with a node, the formula is 0/0 and the corresponding sample is returned instead. The points are
+        processed in chunks (see ``evaluate``), thus the temporary memory is bounded by chunk_size * n.
+
+        Parameters:
+        -----------
+        y_data : ndarray
+            samples of the unknown function at the nodes, one row per node
+        x : ndarray
+            evaluation points of any shape
+        chunk_size : int, default = 2**16
+            number of points evaluated at once
+
+        Returns:
+        --------
+        ndarray
+            interpolant over x, with shape x.shape + y_data.shape[1:]
+
+        Raises:
+        -------
+        ValueError
+            `y_data` has less than `instance.n` entries
+        """
+        return self.evaluate(y_data, x, chunk_size)
+
+    def evaluate(self, y_data: ndarray, x: ndarray, chunk_size: Optional[int] = 2**16,
+                 out: Optional[ndarray] = None) -> ndarray:
+        """
+        Evaluate the interpolant at the points x chunk by chunk, optionally writing into a preallocated array
+
+        Only ``chunk_size`` points are read from x (which may be a memmap) and evaluated at a time, and the
+        results are written into the corresponding slice of ``out``. If ``out`` is a memmap as well, neither the
+        points nor the values ever have to fit into memory at once.
+
+        Parameters:
+        -----------
+        y_data : ndarray
+            samples of the unknown function at the nodes, one row per node
+        x : ndarray
+            evaluation points of any shape
+        chunk_size : int, default = 2**16
+            number of points evaluated at once
+        out : ndarray, optional
+            array of shape x.shape + y_data.shape[1:] the values are written into
+
+        Returns:
+        --------
+        ndarray
+            `out`, or a new array if it was not passed
+
+        Raises:
+        -------
+        ValueError
+            `y_data` has less than `instance.n` entries or `out` has the wrong shape
+        """
+        y = self.samples(y_data)
+        x = asarray(x)
+        shape = x.shape + y.shape[1:]
+        if out is None:
+            out = empty(shape, dtype=float64)
+        elif out.shape != shape:
+            raise ValueError(f'out has shape {out.shape}, but the result has shape {shape}')
+
+        x_flat = x.reshape(-1)
+        out_flat = out.reshape((-1,) + y.shape[1:])  # a view for contiguous arrays (and memmaps)
+        for i in range(0, len(x_flat), chunk_size):
+            out_flat[i:i+chunk_size] = self.chunk(y, x_flat[i:i+chunk_size])
+        if not shares_memory(out_flat, out):
+            out[...] = out_flat.reshape(shape)
+        return out
+
+    def chunks(self, y_data: ndarray, x_chunks: Iterable[ndarray]) -> Iterator[ndarray]:
+        """
+        Lazily evaluate the interpolant on a stream of point arrays (e.g. a generator), yielding one result each
+        """
+        y = self.samples(y_data)
+        for x in x_chunks:
+            x = asarray(x, dtype=float64)
+            yield self.chunk(y, x.reshape(-1)).reshape(x.shape + y.shape[1:])
+
+    def samples(self, y_data: ndarray) -> ndarray:
+        """
+        Check the passed samples and return the first n of them as float array
+        """
+        y = asarray(y_data, dtype=float64)
+        if len(y) < self.n:
+            raise ValueError(f'missing samples, at least {self.n} required')
+        return y[:self.n]
+
+    def chunk(self, y: ndarray, x: ndarray) -> ndarray:
+        """
+        Evaluate the interpolant of the checked samples y at the 1D points x, with O(len(x) n) temporary memory
+        """
+        d = subtract.outer(asarray(x, dtype=float64), self.x_data)
+        exact = d == 0.0
+        columns = y.reshape(self.n, -1)
+        with errstate(divide='ignore', invalid='ignore'):
+            c = self.w / d
+            p = (c @ columns) / sum(c, axis=-1)[:, None]
+        hit = any(exact, axis=-1)
+        if any(hit):
+            p[hit] = columns[exact[hit].argmax(axis=-1)]
+        return p.reshape((len(x),) + y.shape[1:])
+
 
 def LagrangeInterpPoly(x_data: ndarray, y_data: ndarray, ax: Axes, n: Optional[int] = -1, **kwargs) -> List[Line2D]:
     """
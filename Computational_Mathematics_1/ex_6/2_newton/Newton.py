@@ -6,7 +6,9 @@ course        : Computational Mathematics 1 | MAT.208UB
 """
 
 # imports
-from numpy import ndarray, flip, float64, array
+from __future__ import annotations
+from numpy import ndarray, flip, float64, array, asarray, ones_like, abs, multiply
+from typing import Optional
 
 def compute_coeffs(y_data : ndarray, x_data : ndarray) -> ndarray:
     """
@@ -16,14 +18,14 @@ def compute_coeffs(y_data : ndarray, x_data : ndarray) -> ndarray:
     Parameters:
     -----------
     y_data : ndarray
-        samples of the unknown function
+        samples of the unknown function, or a (n x k) matrix with one dataset per column
     x_data : ndarray
         sample-points (times) for the passed samples
 
     Returns:
     --------
     ndarray:
-        the coefficients for the newton-interpolation formula
+        the coefficients for the newton-interpolation formula, (n x k) for k datasets
 
     Raises:
     -------
@@ -41,9 +43,10 @@ def compute_coeffs(y_data : ndarray, x_data : ndarray) -> ndarray:
 
     n = len(x_data) - 1
     c = array(y_data).astype(float64)
+    x_data = asarray(x_data, dtype=float64).reshape((-1,) + (1,) * (c.ndim - 1))
+    # all differences of order k at once, the right-hand side is evaluated before c is overwritten
     for k in range(1,n+1):
-        for i in reversed(range(k,n+1)):
-            c[i] = (c[i] - c[i-1]) / (x_data[i] - x_data[i-k])
+        c[k:] = (c[k:] - c[k-1:-1]) / (x_data[k:] - x_data[:-k])
 
     return c
 
@@ -54,7 +57,7 @@ def horner(coeffs : ndarray, x : ndarray, x_data : ndarray) -> ndarray:
     Parameters:
     -----------
     coeffs : ndarray
-        array of coefficients for newton interpolation
+        array of coefficients for newton interpolation, or (n x k) matrix of k interpolants
     x : ndarray
         x-values to evaluate the interpolant on
     x_data : ndarray
@@ -63,7 +66,7 @@ def horner(coeffs : ndarray, x : ndarray, x_data : ndarray) -> ndarray:
     Returns:
     --------
     ndarray
-        the interpolant evaluated on `x`
+        the interpolant evaluated on `x`, with an additional last axis of length k for k interpolants
 
     Raises:
     -------
@@ -74,7 +77,106 @@ def horner(coeffs : ndarray, x : ndarray, x_data : ndarray) -> ndarray:
     if len(coeffs) != len(x_data):
         raise ValueError('mismatched number of coefficients and nodes')
 
+    if coeffs.ndim == 2:
+        x = asarray(x)[..., None]  # evaluate all k interpolants at every point
     p = coeffs[-1]
-    for (c,xk) in zip(flip(coeffs[:-1]), flip(x_data[:-1])):
+    for (c,xk) in zip(flip(coeffs[:-1], 0), flip(x_data[:-1])):
         p = c + (x - xk) * p
-    return p
\ No newline at end of file
+    return p
+
+class NewtonInterpolant:
+    """
+    Newton interpolation polynomial, which is extended one node at a time
+
+    Instead of the whole divided-difference table only its last row is kept, i.e. the differences
+
+        d_k = f[x_(n-k), ..., x_n],    k = 0, ..., n
+
+    of the newest node x_n. A new node x_(n+1) gets the row d'_0 = y, d'_k = (d'_(k-1) - d_(k-1)) / (x_(n+1) -
+    x_(n+1-k)), whose last entry is the new coefficient. Thus adding a node costs O(n) instead of O(n^2) for
+    ``compute_coeffs``, and all previous coefficients stay unchanged. The nodes may be added in any order.
+
+    The newest term c_n (x - x_0) ... (x - x_(n-1)) is the difference between the interpolants of n and n+1
+    nodes, its magnitude (``error_estimate``) estimates the error of the previous interpolant and can be used to
+    stop adding nodes once it falls below a tolerance.
+
+    Attributes:
+    -----------
+    x_data : list
+        the nodes in the order they were added
+    coeffs : list
+        the coefficients of the newton form
+    diagonal : list
+        the last row of the divided-difference table
+
+    Methods:
+    --------
+    add_node(x : float, y : float) -> None
+        add a sample and the corresponding coefficient in O(n)
+    error_estimate(x : ndarray) -> ndarray
+        magnitude of the newest term of the newton form at x
+
+    Constructor:
+    ------------
+        Parameters:
+        -----------
+        x_data : ndarray, optional
+            initial nodes
+        y_data : ndarray, optional
+            samples at the initial nodes
+    """
+
+    def __init__(self, x_data: Optional[ndarray] = None, y_data: Optional[ndarray] = None) -> None:
+        self.x_data = []
+        self.coeffs = []
+        self.diagonal = []
+        if x_data is not None:
+            if len(y_data) != len(x_data):
+                raise ValueError('x-nodes and y-values must have same dimension')
+            for x, y in zip(x_data, y_data):
+                self.add_node(x, y)
+
+    def __len__(self) -> int:
+        return len(self.x_data)
+
+    def __call__(self, x: float | ndarray) -> float | ndarray:
+        """
+        Evaluate the interpolant at x with the nested horner scheme
+        """
+        if not self.x_data:
+            raise ValueError('interpolant has no nodes yet')
+        return horner(array(self.coeffs), x, array(self.x_data))
+
+    def add_node(self, x: float, y: float | ndarray) -> None:
+        """
+        Add the sample (x, y) and compute the new coefficient from the last row of the table in O(n)
+
+        Raises:
+        -------
+        ValueError
+            if `x` is already a node
+        """
+        if x in self.x_data:
+            raise ValueError(f'node {x} is already contained in the nodes')
+        n = len(self.x_data)
+        row = [asarray(y, dtype=float64)]  # k samples of k datasets sharing the nodes
+        for k in range(1, n + 1):
+            row.append((row[k-1] - self.diagonal[k-1]) / (x - self.x_data[n-k]))
+        self.x_data.append(x)
+        self.diagonal = row
+        self.coeffs.append(row[-1])
+
+    def error_estimate(self, x: float | ndarray) -> float | ndarray:
+        """
+        Return the magnitude of the newest term c_n (x - x_0) ... (x - x_(n-1)) at x
+
+        This is the correction the last node added to the interpolant of the previous nodes, thus it estimates
+        the error of that interpolant (and usually bounds the error of the current one for smooth functions).
+        """
+        if not self.x_data:
+            raise ValueError('interpolant has no nodes yet')
+        x = asarray(x, dtype=float64)
+        w = ones_like(x)
+        for xk in self.x_data[:-1]:
+            w = w * (x - xk)
+        return abs(multiply.outer(w, self.coeffs[-1]))
@@ -6,7 +6,10 @@ course        : Computational Mathematics 1 | MAT.208UB
 """
 
 # imports
-from numpy import zeros, full_like, ndarray, float64, max, min, linspace
+from numpy import zeros, ndarray, float64, max, min, linspace, asarray, array, arange, repeat, unique, exp, \
+    subtract, where, minimum, errstate, empty, broadcast_shapes, argmax, abs
+from math import lgamma
+from typing import Optional, Sequence, Tuple
 from matplotlib.axes import Axes
 from matplotlib.lines import Line2D
 
@@ -48,59 +51,164 @@ def Hermite(x_data : ndarray, y_data : ndarray, y_prime : ndarray) -> ndarray:
     if len(x_data) != len(y_data) or len(x_data) != len(y_prime):
         raise ValueError('x_data, y_data and y_prime must be of same length')
 
-    n = len(x_data)
+    # a node with value and first derivative is the confluent case with two conditions per node
+    return ConfluentHermite(x_data, [[y, yp] for y, yp in zip(y_data, y_prime)])
 
-    xcol = zeros(2 * n, dtype=float64)
-    col1 = zeros(2 * n, dtype=float64)
-    col2 = zeros(2 * n - 1, dtype=float64)
+def Hermiteval(c : ndarray, xcol : ndarray, x : ndarray) -> ndarray:
+    """
+    Evaluate hermite-polynomial with coefficients `c`
+
+    Parameters:
+    -----------
+    c : ndarray
+        coefficients for the hermite polynomial
+    xcol : ndarray
+        column of x-nodes produced by divided differences for hermite interpolation
+    x : ndarray
+        values to evaluate interpolant on
+
+    Returns:
+    --------
+    ndarray
+        evaluation of interpolant on `x`
+    
+    """
+
+    return ConfluentHermiteval(c, xcol, x)
+
+
+def ConfluentHermite(x_data : ndarray, derivatives : Sequence[ndarray],
+                     leja : Optional[bool] = False) -> Tuple[ndarray, ndarray]:
+    """
+    Compute the newton coefficients of the confluent hermite interpolant with any number of derivatives per node
 
-    # setup for divided differences
-    for i in range(0, 2*n-1, 2):
-        col1[i] = y_data[int(i / 2)]
-        xcol[i] = x_data[int(i/2)]
-        col1[i+1] = y_data[int(i / 2)]
-        xcol[i+1] = x_data[int(i/2)]
-        col2[i] = y_prime[int(i / 2)]
+    Node x_i with m_i conditions f(x_i), f'(x_i), ..., f^(m_i - 1)(x_i) is repeated m_i times in the node column
+    z. The divided differences of order k are computed for all positions at once: where z[i] == z[i-k], the
+    difference is confluent and equals f^(k)(x_i) / k!, otherwise it is the usual quotient of the differences of
+    order k-1. Thus the table costs one vectorized sweep per order, i.e. N = sum(m_i) array operations of length
+    at most N instead of O(N^2) python iterations.
 
-    for i in range(1, 2*n-2,2):
-        col2[i] = (col1[i+1] - col1[i]) / (xcol[i+1] - xcol[i])
+    The conditions of every node may also hold k columns (i.e. have shape (m_i, k)) for k datasets on the same
+    nodes, all of them are processed by the same sweeps.
 
-    c = zeros(2*n)
-    c[0] = col1[0]
-    c[1:] = col2
-    # regular divided differences, start with second column
-    for k in range(2, 2*n):
-        for i in reversed(range(k,2*n)):
-            c[i] = (c[i] - c[i-1]) / (xcol[i] - xcol[i-k])
+    For many nodes the newton form is only stable if the nodes are taken in leja order (``leja_order``), and if
+    the interval has a length of about 4 (capacity 1), otherwise the coefficients grow or decay like
+    (length / 4)^-N. Map the nodes to such an interval and scale the k-th derivatives by (length / 4)^k, then
+    thousands of nodes are no problem.
 
+    Parameters:
+    -----------
+    x_data : ndarray
+        pairwise distinct x-coordinates of the nodes
+    derivatives : Sequence[ndarray]
+        for every node the array [f(x_i), f'(x_i), ..., f^(m_i - 1)(x_i)], or a (n x m) array for m conditions
+        at every node
+    leja : bool, default = False
+        reorder the nodes (with their conditions) by ``leja_order``
+
+    Returns:
+    --------
+    ndarray
+        coefficients for the hermite polynomial, shape (N,) or (N, k)
+    ndarray
+        column of x-nodes (with repetitions) belonging to the coefficients
+
+    Raises:
+    -------
+    ValueError
+        if `x_data` and `derivatives` are of different length, or a node has no condition
+    ValueError
+        if the nodes are not pairwise distinct
+    """
+    x_data = asarray(x_data, dtype=float64)
+    rows = [asarray(d, dtype=float64) for d in derivatives]
+    if len(rows) != len(x_data):
+        raise ValueError('x_data and derivatives must be of same length')
+    counts = array([len(r) for r in rows])
+    if (counts == 0).any():
+        raise ValueError('every node needs at least one condition')
+    if len(unique(x_data)) != len(x_data):
+        raise ValueError('x-nodes must be pairwise distinct')
+
+    if leja:
+        order = leja_order(x_data)
+        x_data, rows, counts = x_data[order], [rows[i] for i in order], counts[order]
+
+    n, m = len(rows), max(counts)
+    batch = rows[0].shape[1:]
+    # conditions scaled by 1/k!, padded to m per node
+    D = zeros((n, m) + batch, dtype=float64)
+    for i, r in enumerate(rows):
+        D[i, :len(r)] = r
+    D *= array([exp(-lgamma(k + 1)) for k in range(m)]).reshape((1, m) + (1,) * len(batch))
+
+    node = repeat(arange(n), counts)
+    xcol = x_data[node]
+    c = D[node, 0]
+    dz = zeros(len(xcol), dtype=float64)
+    for k in range(1, len(xcol)):
+        subtract(xcol[k:], xcol[:-k], out=dz[k:])
+        step = dz[k:].reshape((-1,) + (1,) * len(batch))
+        with errstate(divide='ignore', invalid='ignore'):
+            # the right-hand side is evaluated before c is overwritten
+            c[k:] = where(step == 0.0, D[node[k:], minimum(k, m - 1)], (c[k:] - c[k-1:-1]) / step)
     return c, xcol
 
-def Hermiteval(c : ndarray, xcol : ndarray, x : ndarray) -> ndarray:
+def leja_order(x_data : ndarray) -> ndarray:
     """
-    Evaluate hermite-polynomial with coefficients `c`
+    Return the indices of the nodes in leja order
+
+    The first node has the largest magnitude, every further node maximizes the product of the distances to all
+    previous ones. The products are kept normalized to avoid underflow, the ordering costs O(n^2).
+    """
+    x_data = asarray(x_data, dtype=float64)
+    order = [int(argmax(abs(x_data)))]
+    dist = abs(x_data - x_data[order[0]])
+    for _ in range(len(x_data) - 1):
+        j = int(argmax(dist))
+        order.append(j)
+        dist *= abs(x_data - x_data[j])
+        dist /= max(dist) or 1.0
+    return array(order)
+
+def ConfluentHermiteval(c : ndarray, xcol : ndarray, x : ndarray, out : Optional[ndarray] = None) -> ndarray:
+    """
+    Evaluate the newton form with coefficients `c` on the node column `xcol` with nested multiplication
+
+    p = c_(N-1), p = p (x - z_j) + c_j for j = N-2, ..., 0, where the running value and the factor (x - z_j) live
+    in two buffers, which are updated in place, so no array is allocated per term. For (N x k) coefficients the
+    result has shape x.shape + (k,).
 
     Parameters:
     -----------
     c : ndarray
         coefficients for the hermite polynomial
     xcol : ndarray
-        column of x-nodes produced by divided differences for hermite interpolation
+        column of x-nodes produced by ``ConfluentHermite``
     x : ndarray
         values to evaluate interpolant on
+    out : ndarray, optional
+        array the values are written into
 
     Returns:
     --------
     ndarray
         evaluation of interpolant on `x`
-    
     """
-
-    value = full_like(x, c[0])
-    pfactor = (x - xcol[0])
-    for k, (c,xk) in enumerate(zip(c[1:],xcol[1:])):
-        value = value + c * pfactor
-        pfactor = pfactor * (x - xk)
-    return value
+    c = asarray(c, dtype=float64)
+    x = asarray(x, dtype=float64)
+    if c.ndim == 2:
+        x = x[..., None]
+    shape = broadcast_shapes(x.shape, c.shape[1:])
+    if out is None:
+        out = empty(shape, dtype=float64)
+    out[...] = c[-1]
+    factor = empty(x.shape, dtype=float64)
+    for j in reversed(range(len(c) - 1)):
+        subtract(x, xcol[j], out=factor)
+        out *= factor
+        out += c[j]
+    return out[()]
 
 
 def HermiteInterp(x_data : ndarray, y_data : ndarray, y_prime : ndarray, x: ndarray, ax : Axes) -> Line2D:
@@ -6,49 +6,118 @@ course        : Computational Mathematics 1 | MAT.208UB
 """
 
 # imports
-from numpy import ndarray, float64, array, sign, all
+from __future__ import annotations
+from numpy import ndarray, float64, array, sign, all, asarray, empty, full, inf, abs, multiply, subtract, divide, \
+    broadcast_shapes, zeros, where, clip, arange, nan, ones, isfinite, minimum, maximum, errstate, sort, concatenate
+from typing import Optional, Tuple
 
-def Neville(x_data: ndarray, y_data: ndarray, x: ndarray) -> ndarray:
+def Neville(x_data: ndarray, y_data: ndarray, x: ndarray, tol: Optional[float] = None,
+            error: Optional[bool] = False) -> ndarray | Tuple[ndarray, ndarray]:
     """
     Perform neville-interpolation (iteratively)
 
+    The tableau is computed by ``tableau`` on a float buffer, see there for the early stopping with `tol`.
+
     Parameters:
     -----------
     x_data : ndarray
         x-coordinates for the samples
     y_data : ndarray
-        samples of the unknown function
+        samples of the unknown function, or a (n x k) matrix with one dataset per column
     x : ndarray
         x-values to evaluate the interpolant on
+    tol : float, optional
+        stop as soon as the error estimate of every point is below `tol`
+    error : bool, default = False
+        additionally return the error estimate
 
     Returns:
     --------
     ndarray:
-        the interpolant evaluated on `x`
+        the interpolant evaluated on `x`, with shape x.shape + y_data.shape[1:]
+    ndarray:
+        the error estimate for every value, only if `error` is set
 
     Raises:
     -------
     ValueError
         if `x_data` is not sorted in ascending order
     ValueError
-        if `y_data` and `x_data` are of different shape
+        if `y_data` and `x_data` are of different length
     """
-    x_data = array(x_data)
-    y_data = array(y_data)
+    x_data = array(x_data, dtype=float64)
+    y_data = array(y_data, dtype=float64)
+    x = asarray(x, dtype=float64)
 
     if not all(x_data[:-1] < x_data[1:]):
         raise ValueError('x_data must be sorted in ascending order')
     
-    if x_data.shape != y_data.shape:
-        raise ValueError('x_data and y_data must be of same shape')
+    if len(x_data) != len(y_data) or x_data.ndim != 1:
+        raise ValueError('x_data and y_data must be of same length')
 
+    # nodes and samples get singleton axes for the points x, which in turn get singleton axes for the datasets
     n = len(x_data)
-    p = array(y_data, dtype=object)  # i'm unhappy about this :/
+    x_data = x_data.reshape((n,) + (1,) * (x.ndim + y_data.ndim - 1))
+    y_data = y_data.reshape((n,) + (1,) * x.ndim + y_data.shape[1:])
+    p, err = tableau(x_data, y_data, x.reshape(x.shape + (1,) * (y_data.ndim - x.ndim - 1)), tol)
+    p, err = p[()], err[()]  # scalars for a single point, as for the object tableau
+    return (p, err) if error else p
+
+
+def tableau(x_data: ndarray, y_data: ndarray, x: ndarray, tol: Optional[float] = None) -> Tuple[ndarray, ndarray]:
+    """
+    Compute the neville tableau on a float buffer, which is updated in place column by column
+
+    Row i of column k holds the value of the polynomial interpolating the nodes i,...,i+k, hence after column k
+    the first row is the interpolant of the first k+1 nodes. The difference of the first rows of the last two
+    columns, i.e. the change caused by the last node, is returned as error estimate. If `tol` is given, the
+    tableau stops as soon as this estimate is below `tol` for all points, so for early stopping the nodes should
+    be ordered by their relevance (e.g. by their distance to x). The nodes need not be sorted otherwise.
+
+    Apart from the usual 1D nodes, `x_data` and `y_data` may have shape (n, ...), which allows a different set
+    of nodes and samples for every point, as long as all trailing shapes broadcast against the shape of x.
+
+    Parameters:
+    -----------
+    x_data : ndarray
+        the n pairwise distinct nodes, shape (n, ...)
+    y_data : ndarray
+        samples at the nodes, shape (n, ...)
+    x : ndarray
+        points to evaluate the interpolant at
+    tol : float, optional
+        tolerance for the error estimate to stop early
+
+    Returns:
+    --------
+    ndarray:
+        the interpolant evaluated on `x` (broadcast shape of the trailing axes)
+    ndarray:
+        the error estimate for every value (inf for a single node)
+    """
+    x_data = asarray(x_data, dtype=float64)
+    y_data = asarray(y_data, dtype=float64)
+    n = len(x_data)
+    shape = broadcast_shapes(x_data.shape[1:], y_data.shape[1:], asarray(x).shape)
+
+    P = empty((n,) + shape, dtype=float64)
+    P[...] = y_data
+    T = empty((n,) + shape, dtype=float64)
+    d = x_data - x  # x_i - x
+    err = full(shape, inf)
 
     for k in range(1, n):
-        for i in range(n-k):
-            p[i] = ((x - x_data[i+k]) * p[i] + (x_data[i] - x) * p[i+1]) / (x_data[i] - x_data[i+k])
-    return p[0]
+        m = n - k
+        # P[i] = ((x - x_(i+k)) P[i] + (x_i - x) P[i+1]) / (x_i - x_(i+k)) for i < m, without temporaries
+        multiply(d[k:], P[:m], out=T[:m])
+        err = P[0].copy()
+        multiply(d[:m], P[1:m+1], out=P[:m])
+        subtract(P[:m], T[:m], out=P[:m])
+        divide(P[:m], x_data[:m] - x_data[k:], out=P[:m])
+        err = abs(P[0] - err)
+        if tol is not None and (err <= tol).all():
+            break
+    return P[0].copy(), err
 
 
 def InverseNeville(x_data: ndarray, y_data: ndarray, i: int, k: int) -> float64:
@@ -60,9 +129,8 @@ def InverseNeville(x_data: ndarray, y_data: ndarray, i: int, k: int) -> float64:
     `xl` (the „left“ x-node) and `xr` (the „right“ x-node), between which a sign change occurs in the samples of 
     `y_data`.
 
-    The following algorithm is based on the bisection method. However instead of using f, which is unknown, we 
-    linearly interpolate it using `Neville()` between `xl` and `xr` and solve the linear equation. Then with the 
-    found x-value, we compute the y-value using all available nodes.
+    The root of the interpolant of all nodes in the interval is found with ``NevilleRoots``, which stops as soon
+    as it has converged.
 
     Parameters:
     -----------
@@ -73,7 +141,7 @@ def InverseNeville(x_data: ndarray, y_data: ndarray, i: int, k: int) -> float64:
     i : int
         index of the left x-value (i.e. before the sign change)
     k : int
-        number of iterations
+        maximal number of iterations
 
     Returns:
     --------
@@ -90,32 +158,128 @@ def InverseNeville(x_data: ndarray, y_data: ndarray, i: int, k: int) -> float64:
     if sign(y_data[i]) == sign(y_data[i+1]) or sign(y_data[i]) == 0 or sign(y_data[i+1]) == 0:
         raise ValueError('specified interval does not contain zero of f')
 
-    yl = y_data[i]
-    yr = y_data[i+1]
-
-    xl = x_data[i]
-    xr = x_data[i+1]
-    xz = (xl*yr - xr*yl) / (yr - yl)
-
-    for l in range(k):
-        xz = (xl*yr - xr*yl) / (yr - yl)
-        yz = Neville(x_data, y_data, xz)
-
-        if yz > 0: # das some if-statements
-            if yl > 0:
-                yl = yz
-                xl = xz
-            elif yr > 0 :
-                yr = yz
-                xr = xz
-        elif yz < 0.0:
-            if yl < 0.0:
-                yl = yz
-                xl = xz
-            elif yr < 0.0:
-                yr = yz
-                xr = xz
-
-    return xz
+    return NevilleRoots(x_data, y_data, degree=None, maxiter=k, brackets=array([i]))[0]
+
+
+def NevilleRoots(x_data: ndarray, y_data: ndarray, degree: Optional[int] = 5, tol: Optional[float] = 1e-12,
+                 maxiter: Optional[int] = 50, brackets: Optional[ndarray] = None) -> ndarray:
+    """
+    Find the roots of the interpolant of the samples in all intervals with a sign change at once
+
+    Every bracket [x_i, x_(i+1)] uses the interpolant of the `degree`+1 nodes around it as model of f. A low degree
+    keeps the model local, the interpolant of many equispaced nodes oscillates and overflows. The first guess is the
+    true inverse interpolant, i.e. the tableau with the roles of x and y swapped evaluated at y = 0, which is already
+    accurate if f is monotone near the bracket, or the secant if it leaves the bracket. Then, like in brent's method,
+    every iteration tries inverse quadratic interpolation through the last three points (again a neville tableau in y),
+    falls back to the secant and finally to bisection, if the guess leaves the bracket or is not closer to the best
+    point than half of the step before last. Every step is at least the tolerance, so that the bracket also collapses
+    from the stale side. The model is evaluated for all brackets with one call of ``tableau`` per iteration, using a
+    separate node set per bracket. A bracket has converged once its width is below `tol` (relative to the root) or the
+    model vanishes, the root is the evaluated point with the smaller residual (also if `maxiter` runs out, with
+    `maxiter` = 0 it is the first guess). Where the model is not finite, the secant through the end points of the
+    bracket is used instead.
+
+    Parameters:
+    -----------
+    x_data : ndarray
+        x-coordinates for the samples, sorted in ascending order
+    y_data : ndarray
+        samples of the unknown function
+    degree : int, default = 5
+        degree of the local interpolants, None uses the interpolant of all nodes
+    tol : float, default = 1e-12
+        relative tolerance for the roots
+    maxiter : int, default = 50
+        maximal number of iterations
+    brackets : ndarray, optional
+        indices i of the intervals to search, defaults to all intervals with a sign change
+
+    Returns:
+    --------
+    ndarray:
+        the roots in ascending order, including nodes with a vanishing sample
+
+    Raises:
+    -------
+    ValueError
+        if `x_data` is not sorted in ascending order or `y_data` has a different length
+    ValueError
+        if `degree` is smaller than 1
+    ValueError
+        if one of the passed `brackets` does not contain a sign change
+    """
+    x_data = array(x_data, dtype=float64)
+    y_data = array(y_data, dtype=float64)
+    if not all(x_data[:-1] < x_data[1:]):
+        raise ValueError('x_data must be sorted in ascending order')
+    if x_data.shape != y_data.shape:
+        raise ValueError('x_data and y_data must be of same shape')
+    if degree is not None and degree < 1:
+        raise ValueError(f'local interpolants need at least degree 1, got {degree}')
+
+    n = len(x_data)
+    exact = x_data[y_data == 0.0] if brackets is None else zeros(0)
+    brackets = where(y_data[:-1] * y_data[1:] < 0.0)[0] if brackets is None else asarray(brackets)
+    if len(brackets) == 0:
+        return exact
+    if not all((0 <= brackets) & (brackets < n - 1)) or not all(y_data[brackets] * y_data[brackets + 1] < 0.0):
+        raise ValueError('specified intervals do not all contain a sign change of the samples')
+
+    # local node sets, one column per bracket, as centered as possible around it
+    m = n if degree is None else min(degree + 1, n)
+    first = clip(brackets - (m - 2) // 2, 0, n - m)
+    nodes = first + arange(m)[:, None]
+    lx, ly = x_data[nodes], y_data[nodes]
+
+    a, b = x_data[brackets], x_data[brackets + 1]
+    fa, fb = y_data[brackets], y_data[brackets + 1]
+    c, fc = a.copy(), fa.copy()
+    with errstate(divide='ignore', invalid='ignore', over='ignore'):
+        s = tableau(ly, lx, 0.0)[0]
+    s = where(isfinite(s) & (s > a) & (s < b), s, secant(a, b, fa, fb))
+    roots = full(len(brackets), nan)
+    active = ones(len(brackets), dtype=bool)
+    # d: last step, e: step before last, the first guess is only checked against the bracket
+    d, e = abs(b - a), full(len(brackets), inf)
+
+    for _ in range(maxiter):
+        # brent's safeguard: bisect if the guess leaves the bracket or does not halve the step before last
+        best = where(abs(fa) < abs(fb), a, b)
+        eps = tol * (1 + abs(best))
+        accept = isfinite(s) & (s > minimum(a, b)) & (s < maximum(a, b)) & (abs(s - best) < e / 2)
+        s = where(accept, s, (a + b) / 2)
+        # step by at least eps (towards the other end point), so that the stale end point moves as well
+        s = where(abs(s - best) < eps, best + eps * sign(a + b - 2 * best), s)
+        e, d = where(accept, d, abs(s - best)), abs(s - best)
+        with errstate(invalid='ignore', over='ignore'):
+            fs = tableau(lx, ly, s)[0]
+        fs = where(isfinite(fs), fs, fa + (s - a) * (fb - fa) / (b - a))
+
+        # keep the sign change, the replaced end point becomes the third point of the next interpolation
+        left = sign(fs) == sign(fa)
+        c, fc = where(left, a, b), where(left, fa, fb)
+        a, fa = where(left, s, a), where(left, fs, fa)
+        b, fb = where(left, b, s), where(left, fb, fs)
+
+        done = active & ((fs == 0.0) | (abs(b - a) <= 2 * eps))
+        roots[done] = where(abs(fa) < abs(fb), a, b)[done]
+        active &= ~done
+        if not active.any():
+            break
+
+        # next guess: inverse quadratic interpolation, else secant
+        with errstate(divide='ignore', invalid='ignore'):
+            s_new = tableau(array([fa, fb, fc]), array([a, b, c]), 0.0)[0]
+        s = where(isfinite(s_new), s_new, secant(a, b, fa, fb))
+
+    # out of iterations: the evaluated end point with the smaller residual, for maxiter = 0 the first guess
+    roots[active] = (where(abs(fa) < abs(fb), a, b) if maxiter > 0 else s)[active]
+    return sort(concatenate((roots, exact)))
+
+def secant(a: ndarray, b: ndarray, fa: ndarray, fb: ndarray) -> ndarray:
+    """
+    Root of the line through (a, fa) and (b, fb), which lies inside the bracket if fa and fb differ in sign
+    """
+    return a - fa * (b - a) / (fb - fa)
 
 
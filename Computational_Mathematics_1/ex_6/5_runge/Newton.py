@@ -6,7 +6,7 @@ course        : Computational Mathematics 1 | MAT.208UB
 """
 
 # imports
-from numpy import ndarray, flip, float64, array
+from numpy import ndarray, flip, float64, array, asarray
 
 def compute_coeffs(y_data : ndarray, x_data : ndarray) -> ndarray:
     """
@@ -16,14 +16,14 @@ def compute_coeffs(y_data : ndarray, x_data : ndarray) -> ndarray:
     Parameters:
     -----------
     y_data : ndarray
-        samples of the unknown function
+        samples of the unknown function, or a (n x k) matrix with one dataset per column
     x_data : ndarray
         sample-points (times) for the passed samples
 
     Returns:
     --------
     ndarray:
-        the coefficients for the newton-interpolation formula
+        the coefficients for the newton-interpolation formula, (n x k) for k datasets
 
     Raises:
     -------
@@ -42,9 +42,10 @@ def compute_coeffs(y_data : ndarray, x_data : ndarray) -> ndarray:
 
     n = len(x_data) - 1
     c = array(y_data).astype(float64)
+    x_data = asarray(x_data, dtype=float64).reshape((-1,) + (1,) * (c.ndim - 1))
+    # all differences of order k at once, the right-hand side is evaluated before c is overwritten
     for k in range(1,n+1):
-        for i in reversed(range(k,n+1)):
-            c[i] = (c[i] - c[i-1]) / (x_data[i] - x_data[i-k])
+        c[k:] = (c[k:] - c[k-1:-1]) / (x_data[k:] - x_data[:-k])
 
     return c
 
@@ -55,7 +56,7 @@ def horner(coeffs : ndarray, x : ndarray, x_data : ndarray) -> ndarray:
     Parameters:
     -----------
     coeffs : ndarray
-        array of coefficients for newton interpolation
+        array of coefficients for newton interpolation, or (n x k) matrix of k interpolants
     x : ndarray
         x-values to evaluate the interpolant on
     x_data : ndarray
@@ -64,7 +65,7 @@ def horner(coeffs : ndarray, x : ndarray, x_data : ndarray) -> ndarray:
     Returns:
     --------
     ndarray
-        the interpolant evaluated on `x`
+        the interpolant evaluated on `x`, with an additional last axis of length k for k interpolants
 
     Raises:
     -------
@@ -75,7 +76,9 @@ def horner(coeffs : ndarray, x : ndarray, x_data : ndarray) -> ndarray:
     if len(coeffs) != len(x_data):
         raise ValueError('mismatched number of coefficients and nodes')
 
+    if coeffs.ndim == 2:
+        x = asarray(x)[..., None]  # evaluate all k interpolants at every point
     p = coeffs[-1]
-    for (c,xk) in zip(flip(coeffs[:-1]), flip(x_data[:-1])):
+    for (c,xk) in zip(flip(coeffs[:-1], 0), flip(x_data[:-1])):
         p = c + (x - xk) * p
     return p
\ No newline at end of file
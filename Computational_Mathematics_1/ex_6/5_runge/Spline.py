@@ -0,0 +1,268 @@
+"""
+author        : Moritz Mossböck             | 11820925  | moritz.mossboeck@student.tugraz.at
+file          : Spline.py                   | UTF-8
+target version: python 3.10.9               | 64-bit
+course        : Computational Mathematics 1 | MAT.208UB
+"""
+
+# imports
+from numpy import ndarray, float64, array, asarray, diff, zeros, empty, searchsorted, concatenate, cumsum, \
+    floor, arange, argsort, intp, all
+from typing import Optional, Tuple
+from Crout import LUCDiagSolver, LUCroutDiag
+
+
+class CubicSpline:
+    """
+    Interpolating cubic spline with natural, clamped, not-a-knot or periodic boundary conditions
+
+    On every interval [x_i, x_(i+1)] the spline is the cubic s_i(t) = y_i + b_i t + c_i t^2 + d_i t^3 in the
+    local variable t = x - x_i. All coefficients follow from the second derivatives M_i at the nodes, which
+    solve a tridiagonal system (cyclic for periodic splines), hence the construction costs O(n) with
+    ``LUCDiagSolver``. Evaluation finds the interval of every point by bisection in the precomputed array of
+    inner nodes (``searchsorted``), i.e. O(log n) per point, and evaluates the local cubic with horner's scheme.
+    Outside of [x_0, x_(n-1)] the cubics of the first and last interval are continued, periodic splines are
+    continued periodically.
+
+    Attributes:
+    -----------
+    x_data : ndarray
+        the nodes, sorted in ascending order
+    coeffs : ndarray
+        (4 x n-1) matrix, column i holds y_i, b_i, c_i and d_i
+    M : ndarray
+        the second derivatives at the nodes
+    bc : str
+        the boundary condition
+
+    Methods:
+    --------
+    derivative(x : ndarray, k : int) -> ndarray
+        evaluate the k-th derivative of the spline on x
+    integral(a : ndarray, b : ndarray) -> ndarray
+        integrate the spline from a to b
+
+    Constructor:
+    ------------
+        Parameters:
+        -----------
+        x_data : ndarray
+            x-coordinates of the samples, strictly increasing
+        y_data : ndarray
+            samples of the unknown function
+        bc : str, default = 'natural'
+            one of 'natural' (M_0 = M_(n-1) = 0), 'clamped' (prescribed slopes at both ends), 'not-a-knot' (the
+            third derivative is continuous at x_1 and x_(n-2)) and 'periodic' (y_0 = y_(n-1) up to a relative
+            tolerance of 1e-12, first and second derivatives match at the ends)
+        slopes : tuple, default = (0.0, 0.0)
+            slopes at x_0 and x_(n-1) for the clamped spline
+
+        Raises:
+        -------
+        ValueError
+            if `x_data` is not strictly increasing or `y_data` is of different length
+        ValueError
+            if there are too few nodes for `bc`, or the samples of a periodic spline differ at the ends
+    """
+
+    def __init__(self, x_data: ndarray, y_data: ndarray, bc: Optional[str] = 'natural',
+                 slopes: Optional[Tuple[float, float]] = (0.0, 0.0)) -> None:
+        x = array(x_data, dtype=float64)
+        y = array(y_data, dtype=float64)
+
+        if not all(x[:-1] < x[1:]):
+            raise ValueError('x_data must be strictly increasing')
+        if x.shape != y.shape or x.ndim != 1:
+            raise ValueError('x_data and y_data must be of same shape')
+        if len(x) < {'natural': 2, 'clamped': 2, 'not-a-knot': 4, 'periodic': 4}.get(bc, 0):
+            raise ValueError(f'too few nodes for {bc} boundary conditions')
+        if bc == 'periodic':
+            # allow for rounding errors in the samples of a periodic function, then enforce the periodicity exactly
+            if abs(y[-1] - y[0]) > 1e-12 * abs(y).max():
+                raise ValueError('periodic spline requires y_data[0] == y_data[-1]')
+            y[-1] = y[0]
+
+        self.x_data = x
+        self.bc = bc
+        h = diff(x)
+        delta = diff(y) / h
+
+        if bc == 'natural':
+            self.M = natural(h, delta)
+        elif bc == 'clamped':
+            self.M = clamped(h, delta, *slopes)
+        elif bc == 'not-a-knot':
+            self.M = not_a_knot(h, delta)
+        elif bc == 'periodic':
+            self.M = periodic(h, delta)
+        else:
+            raise ValueError(f'unknown boundary condition {bc}')
+
+        M = self.M
+        self.coeffs = empty((4, len(h)), dtype=float64)
+        self.coeffs[0] = y[:-1]
+        self.coeffs[1] = delta - h * (2 * M[:-1] + M[1:]) / 6
+        self.coeffs[2] = M[:-1] / 2
+        self.coeffs[3] = diff(M) / (6 * h)
+        # integrals over the intervals, cumulated from x_0
+        self.cumulative = concatenate(([0.0], cumsum(self.local(h, -1, arange(len(h))))))
+
+    # special methods
+    def __call__(self, x: ndarray) -> ndarray:
+        return self.derivative(x, 0)
+
+    def __len__(self) -> int:
+        return len(self.x_data)
+
+    def locate(self, x: ndarray) -> Tuple[ndarray, ndarray, ndarray]:
+        """
+        Return the (periodically wrapped) points, the index of their interval and the local variable t
+        """
+        x = asarray(x, dtype=float64)
+        if self.bc == 'periodic':
+            x0, period = self.x_data[0], self.x_data[-1] - self.x_data[0]
+            x = x - floor((x - x0) / period) * period
+        # bisection for sorted points stays within the cache, sorting them first is much faster for large arrays
+        w = x.ravel()
+        order = argsort(w)
+        i = empty(w.shape, dtype=intp)
+        i[order] = searchsorted(self.x_data[1:-1], w[order], 'right')
+        i = i.reshape(x.shape)
+        return x, i, x - self.x_data[i]
+
+    def local(self, t: ndarray, k: int, i: ndarray) -> ndarray:
+        """
+        Evaluate the k-th derivative (k = -1: the integral from 0 to t) of the local cubics i at t by horner
+        """
+        c = self.coeffs[:, i]
+        if k == -1:
+            return t * (c[0] + t * (c[1] / 2 + t * (c[2] / 3 + t * c[3] / 4)))
+        if k == 0:
+            return c[0] + t * (c[1] + t * (c[2] + t * c[3]))
+        if k == 1:
+            return c[1] + t * (2 * c[2] + t * 3 * c[3])
+        if k == 2:
+            return 2 * c[2] + 6 * t * c[3]
+        if k == 3:
+            return 6 * c[3] + 0 * t
+        return zeros(t.shape, dtype=float64)
+
+    def derivative(self, x: ndarray, k: Optional[int] = 1) -> ndarray:
+        """
+        Evaluate the k-th derivative of the spline on `x` (the third derivative is piecewise constant)
+
+        Parameters:
+        -----------
+        x : ndarray
+            points to evaluate the derivative on
+        k : int, default = 1
+            order of the derivative, k >= 0
+
+        Returns:
+        --------
+        ndarray
+            the k-th derivative on `x`
+        """
+        if k < 0:
+            raise ValueError(f'invalid order of derivative {k}')
+        _, i, t = self.locate(x)
+        return self.local(t, k, i)
+
+    def antiderivative(self, x: ndarray) -> ndarray:
+        """
+        Evaluate the integral of the spline from x_0 to x with the cumulated integrals over whole intervals
+        """
+        x = asarray(x, dtype=float64)
+        w, i, t = self.locate(x)
+        F = self.cumulative[i] + self.local(t, -1, i)
+        if self.bc == 'periodic':
+            # every full period contributes the integral over [x_0, x_(n-1)]
+            F = F + (x - w) / (self.x_data[-1] - self.x_data[0]) * self.cumulative[-1]
+        return F
+
+    def integral(self, a: ndarray, b: ndarray) -> ndarray:
+        """
+        Integrate the spline from `a` to `b` (both may be arrays of the same shape)
+
+        Parameters:
+        -----------
+        a : ndarray
+            lower bounds
+        b : ndarray
+            upper bounds
+
+        Returns:
+        --------
+        ndarray
+            the integrals
+        """
+        return self.antiderivative(b) - self.antiderivative(a)
+
+
+def natural(h: ndarray, delta: ndarray) -> ndarray:
+    """
+    Second derivatives of the natural spline, M_0 = M_(n-1) = 0 and the n-2 inner equations
+
+        h_(i-1) M_(i-1) + 2 (h_(i-1) + h_i) M_i + h_i M_(i+1) = 6 (delta_i - delta_(i-1))
+    """
+    M = zeros(len(h) + 1, dtype=float64)
+    if len(h) > 1:
+        M[1:-1] = LUCDiagSolver(h[1:-1], 2 * (h[:-1] + h[1:]), h[1:-1], 6 * diff(delta))
+    return M
+
+def clamped(h: ndarray, delta: ndarray, s0: float, s1: float) -> ndarray:
+    """
+    Second derivatives of the clamped spline, the inner equations plus the two equations of the end slopes
+
+        2 h_0 M_0 + h_0 M_1 = 6 (delta_0 - s0),    h_(n-2) M_(n-2) + 2 h_(n-2) M_(n-1) = 6 (s1 - delta_(n-2))
+    """
+    diag = concatenate(([2 * h[0]], 2 * (h[:-1] + h[1:]), [2 * h[-1]]))
+    rhs = concatenate(([6 * (delta[0] - s0)], 6 * diff(delta), [6 * (s1 - delta[-1])]))
+    return LUCDiagSolver(h, diag, h, rhs)
+
+def not_a_knot(h: ndarray, delta: ndarray) -> ndarray:
+    """
+    Second derivatives of the not-a-knot spline
+
+    Continuity of the third derivative at x_1 gives M_0 = ((h_0 + h_1) M_1 - h_0 M_2) / h_1, inserting it into the
+    first inner equation (and the analogue at x_(n-2) into the last one) leaves a tridiagonal system for
+    M_1, ..., M_(n-2).
+    """
+    lower, upper = h[1:-1].copy(), h[1:-1].copy()
+    diag = 2 * (h[:-1] + h[1:])
+    rhs = 6 * diff(delta)
+    diag[0] = (h[0] + h[1]) * (h[0] + 2 * h[1]) / h[1]
+    upper[0] = (h[1] ** 2 - h[0] ** 2) / h[1]
+    diag[-1] = (h[-1] + h[-2]) * (h[-1] + 2 * h[-2]) / h[-2]
+    lower[-1] = (h[-2] ** 2 - h[-1] ** 2) / h[-2]
+    M = zeros(len(h) + 1, dtype=float64)
+    M[1:-1] = LUCDiagSolver(lower, diag, upper, rhs)
+    M[0] = ((h[0] + h[1]) * M[1] - h[0] * M[2]) / h[1]
+    M[-1] = ((h[-1] + h[-2]) * M[-2] - h[-1] * M[-3]) / h[-2]
+    return M
+
+def periodic(h: ndarray, delta: ndarray) -> ndarray:
+    """
+    Second derivatives of the periodic spline
+
+    The unknowns M_0, ..., M_(n-2) (with M_(n-1) = M_0) satisfy the inner equations with all indices taken
+    cyclically, i.e. a tridiagonal system with the additional corner entries A[0, n-2] = A[n-2, 0] = h_(n-2).
+    It is written as (T + u v^T) M = r with u = (g, 0, ..., 0, h_(n-2)) and v = (1, 0, ..., 0, h_(n-2) / g),
+    where T is tridiagonal, and solved with the Sherman-Morrison formula, which takes two solves with T.
+    """
+    hp = concatenate(([h[-1]], h))           # h_(i-1) for i = 0, ..., n-2 (cyclic)
+    dp = concatenate(([delta[-1]], delta))
+    diag = 2 * (hp[:-1] + hp[1:])
+    rhs = 6 * (dp[1:] - dp[:-1])
+    corner = h[-1]
+    g = -diag[0]
+    diag[0] -= g
+    diag[-1] -= corner * corner / g
+    off = h[:-1]
+    factors = LUCroutDiag(off, diag, off)
+    z = zeros(len(diag), dtype=float64)
+    z[0], z[-1] = g, corner
+    y = LUCDiagSolver(off, diag, off, rhs, factors)
+    q = LUCDiagSolver(off, diag, off, z, factors)
+    M = y - q * (y[0] + corner * y[-1] / g) / (1 + q[0] + corner * q[-1] / g)
+    return concatenate((M, [M[0]]))
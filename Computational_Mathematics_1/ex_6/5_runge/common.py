@@ -0,0 +1,35 @@
+from numpy import ndarray, zeros
+
+def crout_backsubs(U : ndarray, b : ndarray) -> ndarray:
+    """
+    Same as ``backsubs(U,b)``, however exploits properties of tridiagonal matrices
+    
+    Given a tridiagonal matrix A and it's LU decomposition based on Crout's method, the linear equation 
+    Ux = b produces a linear recurrence relation for the entries of x, which can be solved in reverse order
+    (from n to 1).
+    
+    Note that U has to be a unit upper triangular matrix, i.e. U[k,k] = 1 for k in range(n).
+    """
+    n = len(b)
+    x = zeros(n)
+    x[-1] = b[-1] # setup recursion
+    
+    for l in reversed(range(n-1)):
+        x[l] = b[l] - U[l,l+1] * x[l+1]
+    return x    
+    
+def crout_forwsubs(L : ndarray, b : ndarray) -> ndarray:
+    """
+    Same as ``forwsubs(U,b)``, however exploits properties of tridiagonal matrices
+    
+    Given a tridiagonal matrix A and it's LU decomposition based on Crout's method, the linear equation 
+    Lx = b produces a linear recurrence relation for the entries of x, which can be solved in regular order
+    (from 1 to n).
+    """
+    n = len(b)
+    x = zeros(n)
+    x[0] = b[0] / L[0,0] # setup recursion
+    
+    for l in range(1,n):
+        x[l] = (b[l] - L[l,l-1] * x[l-1]) / L[l,l]
+    return x    
\ No newline at end of file
@@ -10,7 +10,7 @@ over axis.
 """
 
 # imports
-from numpy import ndarray, flip, float64, array
+from numpy import ndarray, flip, float64, array, asarray
 
 def compute_coeffs(y_data : ndarray, x_data : ndarray) -> ndarray:
     """
@@ -20,14 +20,14 @@ def compute_coeffs(y_data : ndarray, x_data : ndarray) -> ndarray:
     Parameters:
     -----------
     y_data : ndarray
-        samples of the unknown function
+        samples of the unknown function, or a (n x k) matrix with one dataset per column
     x_data : ndarray
         sample-points (times) for the passed samples
 
     Returns:
     --------
     ndarray:
-        the coefficients for the newton-interpolation formula
+        the coefficients for the newton-interpolation formula, (n x k) for k datasets
 
     Raises:
     -------
@@ -45,9 +45,10 @@ def compute_coeffs(y_data : ndarray, x_data : ndarray) -> ndarray:
 
     length = len(x_data) - 1
     coeffs = array(y_data).astype(float64)
+    nodes = asarray(x_data, dtype=float64).reshape((-1,) + (1,) * (coeffs.ndim - 1))
+    # all differences of order k at once, the right-hand side is evaluated before coeffs is overwritten
     for k in range(1,length+1):
-        for i in reversed(range(k,length+1)):
-            coeffs[i] = (coeffs[i] - coeffs[i-1]) / (x_data[i] - x_data[i-k])
+        coeffs[k:] = (coeffs[k:] - coeffs[k-1:-1]) / (nodes[k:] - nodes[:-k])
 
     return coeffs
 
@@ -58,7 +59,7 @@ def horner(coeffs : ndarray, axis : ndarray, x_data : ndarray) -> ndarray:
     Parameters:
     -----------
     coeffs : ndarray
-        array of coefficients for newton interpolation
+        array of coefficients for newton interpolation, or (n x k) matrix of k interpolants
     x : ndarray
         x-values to evaluate the interpolant on
     x_data : ndarray
@@ -67,7 +68,7 @@ def horner(coeffs : ndarray, axis : ndarray, x_data : ndarray) -> ndarray:
     Returns:
     --------
     ndarray
-        the interpolant evaluated on `x`
+        the interpolant evaluated on `x`, with an additional last axis of length k for k interpolants
 
     Raises:
     -------
@@ -78,7 +79,9 @@ def horner(coeffs : ndarray, axis : ndarray, x_data : ndarray) -> ndarray:
     if len(coeffs) != len(x_data):
         raise ValueError('mismatched number of coefficients and nodes')
 
+    if coeffs.ndim == 2:
+        axis = asarray(axis)[..., None]  # evaluate all k interpolants at every point
     rval = coeffs[-1]
-    for (coeff, node) in zip(flip(coeffs[:-1]), flip(x_data[:-1])):
+    for (coeff, node) in zip(flip(coeffs[:-1], 0), flip(x_data[:-1])):
         rval = coeff + (axis - node) * rval
     return rval